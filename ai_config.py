@@ -8,7 +8,12 @@ AI_CONFIG = {
     "ollama_url": "http://localhost:11434",
     "temperature": 0.7,
     "timeout": 60,
-    "max_tokens": 2000
+    "max_tokens": 2000,
+    # llm_client bağlantı havuzu ve yeniden deneme ayarları
+    "connect_timeout": 5,
+    "pool_size": 8,
+    "retries": 2,
+    "retry_backoff": 0.5
 }
 
 # Flask app.py'ye eklenecek import
@@ -17,19 +22,17 @@ AI_CONFIG = {
 # Basit test fonksiyonu
 def test_ai_connection():
     """AI bağlantısını test et"""
-    import requests
+    from llm_client import llm, LLMError  # llm_client AI_CONFIG'i buradan okur
     try:
-        response = requests.get(f"{AI_CONFIG['ollama_url']}/api/tags")
-        if response.status_code == 200:
-            models = response.json().get('models', [])
-            print("✅ Ollama bağlantısı başarılı!")
-            print(f"📦 Yüklü modeller: {[m['name'] for m in models]}")
-            return True
-        else:
+        models = llm.list_models()
+        print("✅ Ollama bağlantısı başarılı!")
+        print(f"📦 Yüklü modeller: {models}")
+        return True
+    except LLMError as e:
+        if e.status_code is not None:
             print("❌ Ollama bağlantısı başarısız!")
-            return False
-    except:
-        print("❌ Ollama servisi çalışmıyor! 'ollama serve' komutunu çalıştırın.")
+        else:
+            print("❌ Ollama servisi çalışmıyor! 'ollama serve' komutunu çalıştırın.")
         return False
 
 if __name__ == "__main__":
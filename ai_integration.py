@@ -5,14 +5,16 @@ DeepSeek R1 veya benzeri modeller için entegrasyon modülü
 """
 
 import json
+from contextlib import nullcontext
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Any, Optional
-import requests
 from datetime import datetime, timedelta
 import os
 import logging
 from logging_config import log_ai_operation
+from field_parsers import parse_datetime_series
+from llm_client import llm, LLMError
 
 class FiberArizaAI:
     def __init__(self, model_type: str = "deepseek-r1", api_key: Optional[str] = None):
@@ -27,6 +29,8 @@ class FiberArizaAI:
         self.api_key = api_key or os.getenv(f"{model_type.upper()}_API_KEY")
         self.ml_data_path = "ml_data"
         self.logger = logging.getLogger('ai_integration')
+        # Model çağrılarını saran bağlam yöneticisi; app.py bunu global LLM kuyruğuyla değiştirir
+        self.llm_slot = nullcontext
         
     def load_data(self) -> Dict[str, pd.DataFrame]:
         """ML verilerini yükle"""
@@ -67,7 +71,7 @@ class FiberArizaAI:
         
         # Bölgesel arıza sıklığı analizi
         if 'bolge' in df.columns and 'ariza_baslangic' in df.columns:
-            df['ariza_baslangic'] = pd.to_datetime(df['ariza_baslangic'], errors='coerce')
+            df['ariza_baslangic'] = parse_datetime_series(df['ariza_baslangic'])
             
             # Son 30 günün arızaları
             recent_date = df['ariza_baslangic'].max() - timedelta(days=30)
@@ -136,7 +140,8 @@ class FiberArizaAI:
         elif self.model_type == "gpt-4":
             return self._call_openai(prompt)
         else:
-            return self._call_local_model(prompt)
+            with self.llm_slot():
+                return self._call_local_model(prompt)
     
     def _call_deepseek_r1(self, prompt: str) -> str:
         """DeepSeek R1 API çağrısı"""
@@ -168,9 +173,7 @@ Veritabanındaki {self._get_total_records()} kayıt üzerinden yapılan analizde
         pass
     
     def _call_local_model(self, prompt: str) -> str:
-        """Yerel model çağrısı (Ollama)"""
-        import requests
-        
+        """Yerel model çağrısı (Ollama, model ve adres AI_CONFIG'ten)"""
         # Fiber terminoloji context'i ekle
         context = """
         Fiber Optik Terminoloji:
@@ -185,22 +188,9 @@ Veritabanındaki {self._get_total_records()} kayıt üzerinden yapılan analizde
         full_prompt = f"{context}\n\n{prompt}"
         
         try:
-            response = requests.post(
-                "http://localhost:11434/api/generate",
-                json={
-                    "model": "deepseek-r1:7b",
-                    "prompt": full_prompt,
-                    "stream": False
-                },
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                return response.json().get("response", "Yanıt alınamadı")
-            else:
-                return f"Model hatası: {response.status_code}"
-        except Exception as e:
-            return f"Bağlantı hatası: {str(e)}. Ollama servisinin çalıştığından emin olun."
+            return llm.generate(full_prompt) or "Yanıt alınamadı"
+        except LLMError as e:
+            return str(e)
     
     def _get_total_records(self) -> int:
         """Toplam kayıt sayısını al"""
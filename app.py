@@ -1,23 +1,42 @@
 import os
-from flask import Flask, render_template, request, redirect, url_for, send_from_directory, flash, jsonify, send_file, Response
+from flask import Flask, render_template, request, redirect, url_for, send_from_directory, flash, jsonify, send_file, Response, stream_with_context, make_response, has_request_context
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 import pandas as pd
-import simplekml
 from io import BytesIO
 import zipfile
 import locale
+import json
+import base64
+import time
+import uuid
+import hashlib
+import math
+import shutil
+import sqlite3
+import threading
+import click
+from concurrent.futures import ThreadPoolExecutor
 from ai_integration import FiberArizaAI
-import requests
 from ai_config import AI_CONFIG
+from llm_client import llm, LLMError
+from field_parsers import parse_coordinate, parse_duration_minutes, parse_datetime_series, datetimes_to_python
+from export_cache import ExportCache
+from kml_writer import KmzWriter
 from datetime import datetime, timezone, timedelta
-from sqlalchemy import func
+from sqlalchemy import func, tuple_, select, event, literal, case, inspect, bindparam, cast, or_, union_all
+from sqlalchemy import table as sql_table, column as sql_column
+from sqlalchemy.orm import object_session
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.engine import Engine
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from logging_config import setup_logging, log_request_response, log_database_operation, log_file_operation, log_user_action
 import logging
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 from functools import wraps
+from contextlib import contextmanager
 
 # Türkçe locale ayarla
 try:
@@ -37,6 +56,18 @@ app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db = SQLAlchemy(app)
 migrate = Migrate(app, db)
 
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    SQLite'ı WAL modunda çalıştır: uzun okumalar (akış yanıtları, export işleri)
+    yazmaları, yazmalar da okumaları bloklamaz; worker'lar ve arka plan işleri
+    aynı veritabanını birbirini kilitlemeden kullanır.
+    """
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.close()
+
 # Setup logging
 logger = setup_logging(app)
 
@@ -48,10 +79,22 @@ login_manager.login_message = 'Lütfen giriş yapın.'
 login_manager.login_message_category = 'info'
 ai = FiberArizaAI()
 insights = ai.generate_dashboard_insights()
-OLLAMA_URL = "http://localhost:11434"
-AI_MODEL = "qwen2.5:3b"
 rag = None
 
+# Akış (streaming) yanıtlarında veritabanından tek seferde çekilecek satır sayısı
+STREAM_BATCH_SIZE = 1000
+
+# Cursor pagination için izin verilen en büyük sayfa boyutu
+MAX_PAGE_SIZE = 1000
+
+# Playground modül kayıt sayıları: {module_id: (veri versiyonu, sayı)}
+_playground_count_cache = {}
+
+# Arıza istatistikleri veri versiyonu değişene kadar önbellekte tutulur;
+# "son 7 gün" sayısı zamanla kaydığı için en fazla bu süre (saniye) kullanılır
+STATS_MAX_AGE = 300
+_stats_cache = {}
+
 
 # Uygulamanın bulunduğu dizinde 'files' klasörü oluştur
 BASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'files')
@@ -90,6 +133,647 @@ class FiberAriza(db.Model):
     otdr_olcum_bilgileri = db.Column(db.Text)
     etkilenen_servis_bilgileri = db.Column(db.Text)  # Bu eksikti!
     yil = db.Column(db.String(10))
+    # Tipli alanlar - metin alanlardan yazma sırasında türetilir
+    lat = db.Column(db.Float)
+    lon = db.Column(db.Float)
+    ariza_suresi_dk = db.Column(db.Integer)
+    hags_suresi_dk = db.Column(db.Integer)
+    kesinti_suresi_dk = db.Column(db.Integer)
+    # Delta sync alanları - ORM event'leri tarafından doldurulur
+    updated_at = db.Column(db.DateTime)
+    row_version = db.Column(db.Integer, index=True)
+    # Bülten sütunlarının özeti - yeniden içe aktarmada değişiklik tespiti için
+    content_hash = db.Column(db.String(32))
+
+    __table_args__ = (
+        db.Index('ix_fiber_ariza_baslangic_id', 'ariza_baslangic', 'id'),  # Cursor pagination
+        # Filtre / gruplama indeksleri (bkz. benchmark_query_plans.py)
+        db.Index('ix_fiber_ariza_bolge_kalici_cozum', 'bolge', 'kalici_cozum'),
+        db.Index('ix_fiber_ariza_kalici_cozum', 'kalici_cozum'),
+        db.Index('ix_fiber_ariza_il', 'il'),
+    )
+
+class DataVersion(db.Model):
+    """Tablo bazlı veri versiyonu - her yazma işleminde artar (ETag için)"""
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+class FiberArizaTombstone(db.Model):
+    """Silinen arıza kayıtlarının izi - delta sync istemcileri için"""
+    id = db.Column(db.Integer, primary_key=True)
+    ariza_id = db.Column(db.Integer, nullable=False)
+    bulten_no = db.Column(db.String(20))
+    version = db.Column(db.Integer, nullable=False, index=True)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class FiberArizaRollup(db.Model):
+    """
+    Yıl/hafta/bölge/il/kök neden bazında önceden hesaplanmış arıza sayıları.
+    ORM hook'ları tarafından artımlı güncellenir; bozulursa
+    `flask rebuild-rollup` ile fiber_ariza tablosundan yeniden üretilir.
+    Anahtar sütunlarında NULL yerine '' tutulur (UNIQUE/ON CONFLICT için).
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    yil = db.Column(db.String(10), nullable=False, default='')
+    hafta = db.Column(db.String(10), nullable=False, default='')
+    bolge = db.Column(db.String(50), nullable=False, default='')
+    il = db.Column(db.String(50), nullable=False, default='')
+    kok_neden = db.Column(db.String(200), nullable=False, default='')
+    ariza_sayisi = db.Column(db.Integer, nullable=False, default=0)
+    hags_asan = db.Column(db.Integer, nullable=False, default=0)
+    cozulen = db.Column(db.Integer, nullable=False, default=0)
+    eksik = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint('yil', 'hafta', 'bolge', 'il', 'kok_neden', name='uq_fiber_ariza_rollup_key'),
+        db.Index('ix_fiber_ariza_rollup_bolge', 'bolge'),
+    )
+
+ROLLUP_KEY_COLUMNS = ('yil', 'hafta', 'bolge', 'il', 'kok_neden')
+ROLLUP_TALLY_COLUMNS = ('ariza_sayisi', 'hags_asan', 'cozulen', 'eksik')
+
+def bump_data_version(connection, name='fiber_ariza'):
+    """Veri versiyonunu yazma işlemiyle aynı transaction içinde artır, yeni değeri döndür"""
+    stmt = sqlite_insert(DataVersion.__table__).values(name=name, version=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['name'],
+        set_={'version': DataVersion.__table__.c.version + 1}
+    ).returning(DataVersion.__table__.c.version)
+    return connection.execute(stmt).scalar()
+
+def get_data_version(name='fiber_ariza'):
+    """Güncel veri versiyonunu döndür (arıza tablosuna dokunmadan)"""
+    version = db.session.execute(
+        select(DataVersion.version).where(DataVersion.name == name)
+    ).scalar()
+    return version or 0
+
+def typed_field_values(get):
+    """Metin koordinat ve süre alanlarından tipli sütun değerlerini hesapla"""
+    return {
+        'lat': parse_coordinate(get('kordinat_a'), limit=90),
+        'lon': parse_coordinate(get('kordinat_b'), limit=180),
+        'ariza_suresi_dk': parse_duration_minutes(get('ariza_suresi')),
+        'hags_suresi_dk': parse_duration_minutes(get('hags_suresi')),
+        'kesinti_suresi_dk': parse_duration_minutes(get('kesinti_suresi')),
+    }
+
+# Bülten Excel'inden gelen ve içerik özetine giren sütunlar
+CONTENT_HASH_COLUMNS = (
+    'hafta', 'bolge', 'il', 'guzergah', 'lokasyon', 'ariza_baslangic', 'ariza_bitis',
+    'ariza_konsolide', 'ariza_kok_neden', 'hags_asildi_mi', 'refakat_durumu',
+    'servis_etkisi', 'ariza_suresi'
+)
+
+def content_hash(get):
+    """
+    Bülten sütunlarının içerik özeti. None ile boş metin aynı sayılır,
+    tarihler ISO biçiminde özetlenir; ORM hook'u, toplu upsert ve Excel
+    içe aktarma aynı fonksiyonu kullanır.
+    """
+    parts = []
+    for column in CONTENT_HASH_COLUMNS:
+        value = get(column)
+        if value is None:
+            value = ''
+        elif isinstance(value, datetime):
+            value = value.isoformat()
+        parts.append(str(value))
+    return hashlib.blake2b('\x1f'.join(parts).encode('utf-8'), digest_size=16).hexdigest()
+
+def fill_typed_fields(ariza):
+    """Metin koordinat ve süre alanlarından tipli sütunları doldur"""
+    for column, value in typed_field_values(lambda name: getattr(ariza, name)).items():
+        setattr(ariza, column, value)
+
+@event.listens_for(FiberAriza, 'before_insert')
+@event.listens_for(FiberAriza, 'before_update')
+def fiber_ariza_changed(mapper, connection, target):
+    """
+    FiberAriza üzerindeki her ORM yazma işleminde tipli alanları doldur,
+    veri versiyonunu artır ve yeni versiyonu kayda işle (delta sync için).
+    api_add_ariza, api_update_ariza ve upload_excel bu yoldan geçer.
+    """
+    session = object_session(target)
+    if session is not None and target in session.dirty and not session.is_modified(target):
+        return  # Net değişiklik yok
+    fill_typed_fields(target)
+    target.content_hash = content_hash(lambda name: getattr(target, name))
+    target.row_version = bump_data_version(connection)
+    target.updated_at = datetime.utcnow()
+
+@event.listens_for(FiberAriza, 'after_delete')
+def fiber_ariza_deleted(mapper, connection, target):
+    """Silinen kayıt için tombstone bırak"""
+    connection.execute(FiberArizaTombstone.__table__.insert().values(
+        ariza_id=target.id,
+        bulten_no=target.bulten_no,
+        version=bump_data_version(connection),
+        deleted_at=datetime.utcnow()
+    ))
+
+def _rollup_text(value):
+    """Rollup anahtarı için değeri metne çevir (None/NaN -> '')"""
+    if value is None or (isinstance(value, float) and value != value):
+        return ''
+    return str(value)
+
+def rollup_entry(get):
+    """
+    Bir arıza kaydının rollup anahtarını ve sayaçlarını hesapla.
+    `get(alan_adı)` alan değerini döndürür; güncellemede eski değerler için kullanılır.
+    rebuild_rollup içindeki SQL ifadeleriyle birebir aynı kurallar uygulanır.
+    """
+    baslangic = get('ariza_baslangic')
+    key = {
+        'yil': _rollup_text(get('yil')) or (str(baslangic.year) if baslangic else ''),
+        'hafta': _rollup_text(get('hafta')),
+        'bolge': _rollup_text(get('bolge')),
+        'il': _rollup_text(get('il')),
+        'kok_neden': _rollup_text(get('ariza_kok_neden')),
+    }
+    tallies = {
+        'ariza_sayisi': 1,
+        'hags_asan': int(get('hags_asildi_mi') == 'Evet'),
+        'cozulen': int(get('kalici_cozum') == 'Evet'),
+        'eksik': int(get('kordinat_a') == '' or get('kalici_cozum') == ''),
+    }
+    return key, tallies
+
+def apply_rollup_delta(connection, key, tallies, sign=1):
+    """Rollup satırına sayaçları ekle (sign=-1 veya negatif sayaçlarla çıkar); boşalan satırı sil"""
+    table = FiberArizaRollup.__table__
+    stmt = sqlite_insert(table).values(**key, **{name: sign * count for name, count in tallies.items()})
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(ROLLUP_KEY_COLUMNS),
+        set_={name: table.c[name] + stmt.excluded[name] for name in ROLLUP_TALLY_COLUMNS}
+    )
+    connection.execute(stmt)
+    if sign * tallies['ariza_sayisi'] < 0:
+        connection.execute(table.delete().where(
+            *[table.c[name] == value for name, value in key.items()],
+            table.c.ariza_sayisi <= 0
+        ))
+
+def rebuild_rollup(connection):
+    """Rollup tablosunu fiber_ariza üzerinden tek bir INSERT ... SELECT ile yeniden üret"""
+    table = FiberArizaRollup.__table__
+    yil = func.coalesce(func.nullif(FiberAriza.yil, ''), func.strftime('%Y', FiberAriza.ariza_baslangic), '')
+    key_columns = [
+        yil,
+        func.coalesce(FiberAriza.hafta, ''),
+        func.coalesce(FiberAriza.bolge, ''),
+        func.coalesce(FiberAriza.il, ''),
+        func.coalesce(FiberAriza.ariza_kok_neden, ''),
+    ]
+    source = select(
+        *key_columns,
+        func.count(FiberAriza.id),
+        func.sum(case((FiberAriza.hags_asildi_mi == 'Evet', 1), else_=0)),
+        func.sum(case((FiberAriza.kalici_cozum == 'Evet', 1), else_=0)),
+        func.sum(case(((FiberAriza.kordinat_a == '') | (FiberAriza.kalici_cozum == ''), 1), else_=0))
+    ).group_by(*key_columns)
+    connection.execute(table.delete())
+    connection.execute(table.insert().from_select(list(ROLLUP_KEY_COLUMNS + ROLLUP_TALLY_COLUMNS), source))
+
+@event.listens_for(FiberAriza, 'after_insert')
+def fiber_ariza_rollup_insert(mapper, connection, target):
+    """Yeni kaydı rollup'a ekle"""
+    key, tallies = rollup_entry(lambda name: getattr(target, name))
+    apply_rollup_delta(connection, key, tallies)
+
+@event.listens_for(FiberAriza, 'after_update')
+def fiber_ariza_rollup_update(mapper, connection, target):
+    """Eski değerlerin katkısını çıkar, yenilerini ekle (değişiklik yoksa dokunma)"""
+    state = inspect(target)
+
+    def previous(name):
+        history = state.attrs[name].history
+        return history.deleted[0] if history.deleted else getattr(target, name)
+
+    old_key, old_tallies = rollup_entry(previous)
+    new_key, new_tallies = rollup_entry(lambda name: getattr(target, name))
+    if (old_key, old_tallies) == (new_key, new_tallies):
+        return
+    apply_rollup_delta(connection, old_key, old_tallies, sign=-1)
+    apply_rollup_delta(connection, new_key, new_tallies)
+
+@event.listens_for(FiberAriza, 'after_delete')
+def fiber_ariza_rollup_delete(mapper, connection, target):
+    """Silinen kaydın katkısını rollup'tan çıkar"""
+    key, tallies = rollup_entry(lambda name: getattr(target, name))
+    apply_rollup_delta(connection, key, tallies, sign=-1)
+
+@app.cli.command('rebuild-rollup')
+def rebuild_rollup_command():
+    """Arıza rollup tablosunu sıfırdan yeniden oluştur"""
+    with db.engine.begin() as connection:
+        rebuild_rollup(connection)
+        groups = connection.execute(select(func.count()).select_from(FiberArizaRollup.__table__)).scalar()
+        version = bump_data_version(connection)
+    print(f"✅ Rollup yeniden oluşturuldu: {groups} grup (veri versiyonu {version})")
+
+# Mekansal indeks: arıza koordinatları üzerinde SQLite R*Tree sanal tablosu.
+# fiber_ariza üzerindeki trigger'larla senkron tutulur; böylece ORM dışı toplu
+# yazmalar (bulk upsert, Excel içe aktarma, delete_all) da indeksi günceller.
+SPATIAL_INDEX_TABLE = 'fiber_ariza_rtree'
+SPATIAL_INDEX_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SPATIAL_INDEX_TABLE} USING rtree(id, min_lat, max_lat, min_lon, max_lon)",
+    f"""CREATE TRIGGER IF NOT EXISTS fiber_ariza_rtree_insert AFTER INSERT ON fiber_ariza
+        WHEN new.lat IS NOT NULL AND new.lon IS NOT NULL BEGIN
+            INSERT INTO {SPATIAL_INDEX_TABLE} VALUES (new.id, new.lat, new.lat, new.lon, new.lon);
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS fiber_ariza_rtree_update AFTER UPDATE OF id, lat, lon ON fiber_ariza BEGIN
+            DELETE FROM {SPATIAL_INDEX_TABLE} WHERE id = old.id;
+            INSERT INTO {SPATIAL_INDEX_TABLE}
+                SELECT new.id, new.lat, new.lat, new.lon, new.lon
+                WHERE new.lat IS NOT NULL AND new.lon IS NOT NULL;
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS fiber_ariza_rtree_delete AFTER DELETE ON fiber_ariza BEGIN
+            DELETE FROM {SPATIAL_INDEX_TABLE} WHERE id = old.id;
+        END""",
+)
+spatial_index = sql_table(
+    SPATIAL_INDEX_TABLE,
+    sql_column('id'), sql_column('min_lat'), sql_column('max_lat'), sql_column('min_lon'), sql_column('max_lon')
+)
+EARTH_RADIUS_KM = 6371.0088
+_spatial_index_available = None
+
+def create_spatial_index(connection, rebuild=False):
+    """R*Tree tablosunu ve trigger'ları oluştur; rebuild=True ise içeriği fiber_ariza'dan yeniden doldur"""
+    for statement in SPATIAL_INDEX_DDL:
+        connection.exec_driver_sql(statement)
+    if rebuild:
+        connection.exec_driver_sql(f"DELETE FROM {SPATIAL_INDEX_TABLE}")
+        connection.exec_driver_sql(
+            f"INSERT INTO {SPATIAL_INDEX_TABLE} SELECT id, lat, lat, lon, lon FROM fiber_ariza "
+            "WHERE lat IS NOT NULL AND lon IS NOT NULL"
+        )
+
+def spatial_index_available():
+    """
+    R*Tree tablosu var mı? (migration uygulanmamışsa ya da SQLite RTREE
+    modülü olmadan derlenmişse sorgular lat/lon aralık filtresine düşer)
+    """
+    global _spatial_index_available
+    if _spatial_index_available is None:
+        _spatial_index_available = inspect(db.engine).has_table(SPATIAL_INDEX_TABLE)
+    return _spatial_index_available
+
+def bbox_criteria(bbox, use_rtree=None):
+    """
+    bbox içindeki koordinatlı kayıtlar için filtre koşulları.
+    Adaylar R*Tree'den gelir; R*Tree 32 bit float sakladığı için kesin
+    lat/lon karşılaştırması da eklenir. Batı doğudan büyükse kutu 180.
+    meridyeni kesiyordur ve iki boylam aralığı olarak sorgulanır.
+    use_rtree verilmezse R*Tree tablosunun varlığı veritabanından kontrol edilir.
+    """
+    west, south, east, north = bbox
+    lon_ranges = [(west, east)] if west <= east else [(west, 180), (-180, east)]
+    criteria = [
+        FiberAriza.lat.between(south, north),
+        or_(*[FiberAriza.lon.between(low, high) for low, high in lon_ranges])
+    ]
+    if use_rtree is None:
+        use_rtree = spatial_index_available()
+    if use_rtree:
+        candidates = [
+            select(spatial_index.c.id).where(
+                spatial_index.c.max_lat >= south, spatial_index.c.min_lat <= north,
+                spatial_index.c.max_lon >= low, spatial_index.c.min_lon <= high
+            )
+            for low, high in lon_ranges
+        ]
+        criteria.insert(0, FiberAriza.id.in_(candidates[0] if len(candidates) == 1 else union_all(*candidates)))
+    return criteria
+
+def radius_bbox(lat, lon, radius_km):
+    """Nokta çevresindeki yarıçapı kapsayan (batı, güney, doğu, kuzey) kutusu"""
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    dlon = math.degrees(radius_km / (EARTH_RADIUS_KM * max(math.cos(math.radians(lat)), 1e-6)))
+    return (max(lon - dlon, -180), max(lat - dlat, -90), min(lon + dlon, 180), min(lat + dlat, 90))
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """İki nokta arasındaki büyük daire mesafesi (km)"""
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+@app.cli.command('rebuild-spatial-index')
+def rebuild_spatial_index_command():
+    """Arıza koordinat R*Tree indeksini fiber_ariza tablosundan yeniden oluştur"""
+    with db.engine.begin() as connection:
+        create_spatial_index(connection, rebuild=True)
+        count = connection.execute(select(func.count()).select_from(spatial_index)).scalar()
+    print(f"✅ Mekansal indeks yeniden oluşturuldu: {count} konum")
+
+def compute_fault_stats():
+    """
+    Arıza istatistiklerini rollup tablosundan hesapla (fiber_ariza taranmaz).
+    Toplam, HAGS aşan, çözülen ve eksik sayıları bölge bazında toplanır;
+    zamana bağlı "son 7 gün" sayısı tarih indeksi üzerinden ayrıca sayılır.
+    """
+    rows = db.session.query(
+        FiberArizaRollup.bolge,
+        func.sum(FiberArizaRollup.ariza_sayisi),
+        func.sum(FiberArizaRollup.hags_asan),
+        func.sum(FiberArizaRollup.cozulen),
+        func.sum(FiberArizaRollup.eksik)
+    ).group_by(FiberArizaRollup.bolge).order_by(FiberArizaRollup.bolge).all()
+
+    keys = ('total', 'hags_exceeded', 'solved', 'incomplete')
+    stats = dict.fromkeys(keys, 0)
+    stats['by_region'] = []
+    for bolge, *counts in rows:
+        region = {'bolge': bolge or None}
+        for key, count in zip(keys, counts):
+            region[key] = int(count or 0)
+            stats[key] += region[key]
+        stats['by_region'].append(region)
+
+    seven_days_ago = datetime.now() - timedelta(days=7)
+    stats['last_7_days'] = db.session.query(func.count(FiberAriza.id)).filter(
+        FiberAriza.ariza_baslangic >= seven_days_ago
+    ).scalar()
+
+    top_causes = db.session.query(
+        FiberArizaRollup.kok_neden,
+        func.sum(FiberArizaRollup.ariza_sayisi).label('sayi')
+    ).filter(FiberArizaRollup.kok_neden != '').group_by(FiberArizaRollup.kok_neden).order_by(
+        func.sum(FiberArizaRollup.ariza_sayisi).desc()
+    ).limit(5).all()
+    stats['top_root_causes'] = [{'kok_neden': neden, 'total': int(sayi)} for neden, sayi in top_causes]
+    return stats
+
+def get_fault_stats():
+    """
+    Önbellekli arıza istatistikleri.
+    Yazma hook'ları veri versiyonunu artırdığı için önbellek kendiliğinden geçersiz olur.
+    """
+    version = get_data_version()
+    cached = _stats_cache.get('fiber_ariza')
+    if cached and cached[0] == version and time.monotonic() - cached[1] < STATS_MAX_AGE:
+        return cached[2]
+    stats = compute_fault_stats()
+    _stats_cache['fiber_ariza'] = (version, time.monotonic(), stats)
+    return stats
+
+def etag_by_data_version(f):
+    """
+    Yanıta veri versiyonundan türetilen güçlü bir ETag ekle.
+    If-None-Match eşleşirse sorgu çalıştırılmadan 304 döner.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        version = get_data_version()
+        etag = f'fiber_ariza-v{version}'
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+        response = make_response(f(*args, **kwargs))
+        if response.status_code == 200:
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache'
+            response.headers['X-Data-Version'] = str(version)
+        return response
+    return decorated_function
+
+class BackgroundJob(db.Model):
+    """
+    Uzun süren işlemler için iş kaydı (Excel içe/dışa aktarma, KMZ, AI raporu,
+    playground import). Durum SQLite'ta tutulduğu için tüm gunicorn worker'ları
+    tarafından görülür ve worker yeniden başlatıldığında kaybolmaz.
+    """
+    id = db.Column(db.String(32), primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)  # queued, running, done, failed
+    params = db.Column(db.JSON)
+    progress = db.Column(db.Integer, nullable=False, default=0)
+    message = db.Column(db.String(200))
+    result = db.Column(db.JSON)
+    result_path = db.Column(db.String(500))
+    result_name = db.Column(db.String(200))
+    result_mimetype = db.Column(db.String(100))
+    error = db.Column(db.Text)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    user_id = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'progress': self.progress,
+            'message': self.message,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'status_url': url_for('api_job_status', job_id=self.id),
+            'download_url': url_for('api_job_result', job_id=self.id)
+                            if self.status == 'done' and self.result_path else None
+        }
+
+# Arka plan işleri: her gunicorn worker'ı küçük bir iş parçacığı havuzu çalıştırır,
+# işler SQLite'taki background_job tablosundan atomik olarak sahiplenilir
+JOB_WORKERS = 2            # Worker başına iş parçacığı
+JOB_MAX_RUNNING = 2        # Tüm worker'larda aynı anda çalışabilecek iş sayısı
+JOB_STALE_AFTER = 300      # Bu süre (saniye) heartbeat gelmeyen iş sahipsiz sayılır
+JOB_MAX_ATTEMPTS = 2       # Sahipsiz kalan iş en fazla bu kadar denenir
+JOB_RETENTION_DAYS = 7     # Biten işler ve dosyaları bu süre sonra silinir
+JOBS_DIR = os.path.join(app.instance_path, 'jobs')
+os.makedirs(JOBS_DIR, exist_ok=True)
+_job_handlers = {}
+_job_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix='background-job')
+
+def job_handler(kind):
+    """
+    İş tipini çalıştıracak fonksiyonu kaydet.
+    Fonksiyon (job_id, params, progress) alır ve iş kaydına yazılacak
+    result / result_path / result_name / result_mimetype / message sözlüğü döndürür.
+    """
+    def decorator(f):
+        _job_handlers[kind] = f
+        return f
+    return decorator
+
+def job_dir(job_id):
+    """İşin girdi/çıktı dosyaları için dizin"""
+    path = os.path.join(JOBS_DIR, job_id)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+# Export önbelleği: (export tipi, parametreler, veri versiyonu) anahtarlı dosyalar
+EXPORT_CACHE_DIR = os.path.join(app.instance_path, 'export_cache')
+EXPORT_CACHE_MAX_BYTES = 500 * 1024 * 1024
+export_cache = ExportCache(EXPORT_CACHE_DIR, EXPORT_CACHE_MAX_BYTES)
+
+def cached_export(kind, params, build, extension, version_name='fiber_ariza'):
+    """
+    Export dosyasını önbellekten al, yoksa build(yol) ile üretip önbelleğe koy.
+    Versiyon üretimden önce okunur; üretim sırasında gelen bir yazma dosyayı
+    en fazla anahtarından yeni yapar, hiçbir zaman eski veriyi yeni anahtarla
+    saklamaz.
+
+    Returns:
+        (anahtar, dosya yolu)
+    """
+    key = export_cache.key(kind, params, get_data_version(version_name), extension)
+    path = export_cache.get(key)
+    if path is None:
+        app.logger.info(f"Export önbellekte yok, üretiliyor: {key}")
+        path = export_cache.put(key, build)
+    return key, path
+
+def send_cached_export(key, path, mimetype, download_name):
+    """Önbellekteki export'u ETag (anahtar) ve Last-Modified ile gönder; koşullu istekler 304 alır"""
+    return send_file(
+        path,
+        mimetype=mimetype,
+        as_attachment=True,
+        download_name=download_name,
+        etag=key,
+        last_modified=os.path.getmtime(path)
+    )
+
+def update_job(job_id, **values):
+    """İş kaydını ayrı bir bağlantıyla güncelle (işin kendi transaction'ından bağımsız)"""
+    table = BackgroundJob.__table__
+    with db.engine.begin() as connection:
+        connection.execute(table.update().where(table.c.id == job_id).values(**values))
+
+def submit_job(kind, params=None, job_id=None):
+    """İşi kuyruğa ekle ve bu worker'ın iş parçacığı havuzunu uyandır"""
+    prune_old_jobs()
+    job = BackgroundJob(
+        id=job_id or uuid.uuid4().hex,
+        kind=kind,
+        params=params or {},
+        message='Sırada',
+        user_id=current_user.id if has_request_context() and current_user.is_authenticated else None
+    )
+    db.session.add(job)
+    db.session.commit()
+    log_user_action('submit_job', details={'job_id': job.id, 'kind': kind})
+    _job_executor.submit(run_queued_jobs)
+    return job
+
+def claim_next_job():
+    """Sıradaki işi atomik olarak 'running' durumuna al; global sınır doluysa None"""
+    table = BackgroundJob.__table__
+    now = datetime.utcnow()
+    running = select(func.count()).select_from(table).where(table.c.status == 'running').scalar_subquery()
+    next_id = select(table.c.id).where(table.c.status == 'queued').order_by(
+        table.c.created_at
+    ).limit(1).scalar_subquery()
+    stmt = table.update().where(table.c.id == next_id, running < JOB_MAX_RUNNING).values(
+        status='running',
+        started_at=now,
+        heartbeat_at=now,
+        attempts=table.c.attempts + 1,
+        message='Çalışıyor'
+    ).returning(table.c.id, table.c.kind, table.c.params)
+    with db.engine.begin() as connection:
+        return connection.execute(stmt).first()
+
+def run_queued_jobs():
+    """Kuyruk boşalana veya eşzamanlılık sınırına gelinene kadar işleri çalıştır"""
+    with app.app_context():
+        while True:
+            claimed = claim_next_job()
+            if claimed is None:
+                return
+            run_job(*claimed)
+
+def session_holds_write_lock():
+    """Bu iş parçacığının oturumu açık bir SQLite yazma transaction'ı tutuyor mu?"""
+    session = db.session()
+    if not session.in_transaction():
+        return False
+    return session.connection().connection.dbapi_connection.in_transaction
+
+def run_job(job_id, kind, params):
+    """
+    Tek bir işi çalıştır, sonucunu veya hatasını iş kaydına yaz.
+    progress() heartbeat'i de yeniler; SQLite tek yazıcıya izin verdiği için
+    işin kendi yazma transaction'ı açıkken atlanır, bu yüzden yazan işler
+    progress'i commit'lerden sonra çağırmalıdır.
+    """
+    def progress(done, total=None, message=None):
+        if session_holds_write_lock():
+            return
+        values = {'heartbeat_at': datetime.utcnow()}
+        if total:
+            values['progress'] = min(int(done * 100 / total), 99)
+        if message:
+            values['message'] = message[:200]
+        update_job(job_id, **values)
+
+    started = time.monotonic()
+    try:
+        outcome = _job_handlers[kind](job_id, params or {}, progress) or {}
+        outcome.setdefault('message', 'Tamamlandı')
+        update_job(job_id, status='done', progress=100, finished_at=datetime.utcnow(), **outcome)
+        logger.info(f"Arka plan işi tamamlandı: {kind} {job_id} ({time.monotonic() - started:.1f} sn)")
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Arka plan işi hatası: {kind} {job_id}: {str(e)}", exc_info=True)
+        update_job(job_id, status='failed', error=str(e), message='Hata', finished_at=datetime.utcnow())
+    finally:
+        db.session.remove()
+
+def recover_stale_jobs():
+    """
+    Heartbeat'i kesilen işleri (ör. --max-requests ile yeniden başlatılan
+    worker'da kalanlar) yeniden kuyruğa al; deneme hakkı bitenleri başarısız say.
+    Kuyrukta iş varsa bu worker'ın havuzunu uyandır.
+    """
+    table = BackgroundJob.__table__
+    now = datetime.utcnow()
+    stale = (table.c.status == 'running') & (table.c.heartbeat_at < now - timedelta(seconds=JOB_STALE_AFTER))
+    with db.engine.begin() as connection:
+        # Yazma kilidi yalnızca sahipsiz iş varsa alınır
+        if connection.execute(select(table.c.id).where(stale).limit(1)).first():
+            connection.execute(table.update().where(stale, table.c.attempts >= JOB_MAX_ATTEMPTS).values(
+                status='failed', error='İş yarıda kesildi (worker yeniden başlatıldı)', message='Hata', finished_at=now
+            ))
+            connection.execute(table.update().where(stale).values(status='queued', message='Yeniden kuyruğa alındı'))
+        queued = connection.execute(
+            select(table.c.id).where(table.c.status == 'queued').limit(1)
+        ).first()
+    if queued:
+        _job_executor.submit(run_queued_jobs)
+
+def prune_old_jobs():
+    """Saklama süresi dolan işleri ve dosyalarını sil"""
+    cutoff = datetime.utcnow() - timedelta(days=JOB_RETENTION_DAYS)
+    old_ids = db.session.execute(
+        select(BackgroundJob.id).where(BackgroundJob.finished_at < cutoff)
+    ).scalars().all()
+    for job_id in old_ids:
+        shutil.rmtree(os.path.join(JOBS_DIR, job_id), ignore_errors=True)
+    if old_ids:
+        BackgroundJob.query.filter(BackgroundJob.id.in_(old_ids)).delete(synchronize_session=False)
+        db.session.commit()
+
+def wants_async():
+    """İstemci işin arka planda çalışmasını istedi mi? (?async=1 veya Prefer: respond-async)"""
+    return request.args.get('async') == '1' or 'respond-async' in request.headers.get('Prefer', '')
+
+def job_accepted(job):
+    """202 Accepted: iş kaydı ve durum adresi"""
+    response = jsonify(job.to_dict())
+    response.status_code = 202
+    response.headers['Location'] = url_for('api_job_status', job_id=job.id)
+    return response
 
 # Authentication Models
 class User(UserMixin, db.Model):
@@ -220,6 +904,27 @@ class PlaygroundData(db.Model):
     
     module = db.relationship('PlaygroundModule', backref='records')
 
+    __table_args__ = (
+        db.Index('ix_playground_data_module_id_id', 'module_id', 'id'),  # Cursor pagination
+    )
+
+def playground_version_name(module_id):
+    """Playground modülünün data_version anahtarı"""
+    return f'playground_{module_id}'
+
+@event.listens_for(PlaygroundData, 'after_insert')
+@event.listens_for(PlaygroundData, 'after_update')
+@event.listens_for(PlaygroundData, 'after_delete')
+def playground_data_changed(mapper, connection, target):
+    """Modül verisi değişince modülün veri versiyonunu artır (export önbelleği için)"""
+    bump_data_version(connection, playground_version_name(target.module_id))
+
+@event.listens_for(PlaygroundModule, 'after_update')
+@event.listens_for(PlaygroundModule, 'after_delete')
+def playground_module_changed(mapper, connection, target):
+    """Alan tanımı / görünen ad değişikliği export'u da değiştirir"""
+    bump_data_version(connection, playground_version_name(target.id))
+
 def get_rag():
     """RAG'i lazy load et"""
     global rag
@@ -245,6 +950,68 @@ def parse_utc_date(date_string):
     except:
         return datetime.fromisoformat(date_string)
 
+# Form / API giriş alanı -> (sütun, varsayılan değer)
+ARIZA_INPUT_FIELDS = {
+    # İlk 14 alan
+    'hafta': ('hafta', None),
+    'bolge': ('bolge', None),
+    'bultenNo': ('bulten_no', None),
+    'il': ('il', None),
+    'guzergah': ('guzergah', None),
+    'lokasyon': ('lokasyon', None),
+    'baslangicTarihi': ('ariza_baslangic', None),
+    'bitisTarihi': ('ariza_bitis', None),
+    'arizaKonsolide': ('ariza_konsolide', None),
+    'kokNeden': ('ariza_kok_neden', None),
+    'hags': ('hags_asildi_mi', None),
+    'refakatDurumu': ('refakat_durumu', None),
+    'servisEtkisi': ('servis_etkisi', None),
+    'arizaSuresi': ('ariza_suresi', None),
+    # Son 14 alan
+    'kordinatA': ('kordinat_a', ''),
+    'kordinatB': ('kordinat_b', ''),
+    'serivsEtkisi': ('serivs_etkisi', ''),  # Eski alan (typo ile)
+    'etkilenenServisBilgileri': ('etkilenen_servis_bilgileri', ''),  # Yeni alan
+    'kabloTipi': ('kablo_tipi', ''),
+    'hagsSuresi': ('hags_suresi', ''),
+    'kesintiSuresi': ('kesinti_suresi', ''),
+    'kaliciCozum': ('kalici_cozum', ''),
+    'kullanilanMalzeme': ('kullanilan_malzeme', ''),
+    'aciklama': ('aciklama', ''),
+    'refakatSaglandiMi': ('refakat_saglandi_mi', ''),
+    'deplaseIslahIhtiyaci': ('deplase_islah_ihtiyaci', ''),
+    'hasarTazminSureci': ('hasar_tazmin_sureci', ''),
+    'otdrOlcumBilgileri': ('otdr_olcum_bilgileri', ''),
+}
+
+# Toplu upsert'te tek transaction'da yazılacak kayıt sayısı
+BULK_CHUNK_SIZE = 500
+
+def parse_ariza_payload(data):
+    """
+    Form / API verisini FiberAriza sütun değerlerine çevir ve doğrula.
+    api_add_ariza, api_update_ariza ve api_bulk_upsert_ariza ortak kullanır.
+    'yil' yalnızca gönderildiyse döner (eklemede çağıran varsayılanı verir).
+    Geçersiz veride ValueError fırlatır.
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Kayıt bir JSON nesnesi olmalıdır')
+    values = {}
+    for input_name, (column, default) in ARIZA_INPUT_FIELDS.items():
+        value = data.get(input_name, default)
+        if column in ('ariza_baslangic', 'ariza_bitis'):
+            try:
+                value = parse_utc_date(value)
+            except (TypeError, ValueError):
+                raise ValueError(f'Geçersiz tarih ({input_name}): {value}')
+        values[column] = value
+    if values['bulten_no'] in (None, ''):
+        raise ValueError('Bülten Numarası zorunludur')
+    values['bulten_no'] = str(values['bulten_no']).strip()
+    if 'yil' in data:
+        values['yil'] = data['yil']
+    return values
+
 @app.route('/api/ariza/delete_all', methods=['DELETE'])
 @login_required
 @admin_required
@@ -254,7 +1021,15 @@ def api_delete_all_arizalar():
         # Güvenlik için toplam kayıt sayısını kontrol et
         total = FiberAriza.query.count()
         
-        # Tüm kayıtları sil
+        # Tüm kayıtları sil (toplu silme ORM event'lerini tetiklemez,
+        # versiyon, tombstone'lar ve rollup elle yazılır)
+        connection = db.session.connection()
+        version = bump_data_version(connection)
+        connection.execute(FiberArizaTombstone.__table__.insert().from_select(
+            ['ariza_id', 'bulten_no', 'version', 'deleted_at'],
+            select(FiberAriza.id, FiberAriza.bulten_no, literal(version), literal(datetime.utcnow()))
+        ))
+        connection.execute(FiberArizaRollup.__table__.delete())
         FiberAriza.query.delete()
         db.session.commit()
         
@@ -271,6 +1046,29 @@ def api_delete_all_arizalar():
         logger.error(f"Arıza kayıtları silinirken hata oluştu: {str(e)}", exc_info=True)
         return jsonify({'error': str(e)}), 400
 
+# Arka plan işi endpoint'leri
+@app.route('/api/jobs/<job_id>')
+def api_job_status(job_id):
+    """İşin durumu, ilerlemesi ve (varsa) sonucu"""
+    recover_stale_jobs()
+    job = BackgroundJob.query.get_or_404(job_id)
+    return jsonify(job.to_dict())
+
+@app.route('/api/jobs/<job_id>/result')
+def api_job_result(job_id):
+    """Biten işin sonuç dosyasını indir"""
+    job = BackgroundJob.query.get_or_404(job_id)
+    if job.status != 'done' or not job.result_path:
+        return jsonify({'error': 'Sonuç henüz hazır değil', 'status': job.status}), 409
+    if not os.path.exists(job.result_path):
+        return jsonify({'error': 'Sonuç dosyası bulunamadı'}), 404
+    return send_file(
+        job.result_path,
+        mimetype=job.result_mimetype,
+        as_attachment=True,
+        download_name=job.result_name
+    )
+
 # Authentication Routes
 @app.route('/login', methods=['GET', 'POST'])
 def login():
@@ -358,7 +1156,7 @@ def browse(subpath=''):
         
         parent_dir = '/'.join(parts[:-1]) if parts else ''
         
-        total = FiberAriza.query.count()
+        total = get_fault_stats()['total']
         return render_template('explorer.html', 
                           items=items,
                           current_path=subpath,
@@ -442,6 +1240,242 @@ def create_folder():
 
 
 
+# Excel bülten sütunları -> FiberAriza sütunları
+EXCEL_IMPORT_COLUMNS = {
+    'Hafta': 'hafta',
+    'Bölge': 'bolge',
+    'Bülten Numarası': 'bulten_no',
+    'İL': 'il',
+    'Güzergah': 'guzergah',
+    'Lokasyon': 'lokasyon',
+    'Arıza Başlangıç': 'ariza_baslangic',
+    'Arıza Bitiş': 'ariza_bitis',
+    'Arıza Konsolide Kök Neden': 'ariza_konsolide',
+    'Arıza Kök Neden': 'ariza_kok_neden',
+    'HAGS Aşıldı mı': 'hags_asildi_mi',
+    'Refakat Durumu': 'refakat_durumu',
+    'Servis Etkisi': 'servis_etkisi',
+    'Arıza Süresi': 'ariza_suresi',
+}
+
+# Excel'de bulunmayan ve boş bırakılan alanlar
+EXCEL_IMPORT_EMPTY_FIELDS = (
+    'kordinat_a', 'kordinat_b', 'serivs_etkisi', 'kablo_tipi', 'hags_suresi',
+    'kesinti_suresi', 'kalici_cozum', 'kullanilan_malzeme', 'aciklama'
+)
+
+# Excel içe aktarmada tek seferde okunup yazılacak satır sayısı
+EXCEL_IMPORT_CHUNK_SIZE = 2000
+
+def iter_excel_chunks(file, chunk_size=EXCEL_IMPORT_CHUNK_SIZE):
+    """
+    İlk çalışma sayfasını openpyxl read-only modunda satır satır oku.
+    Önce (başlık listesi, tahmini satır sayısı) çiftini, ardından en fazla
+    chunk_size satırlık {başlık: değer} sözlük listelerini üretir;
+    bellek kullanımı sabit kalır.
+    """
+    import openpyxl
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        worksheet = workbook.worksheets[0]
+        rows = worksheet.iter_rows(values_only=True)
+        header = [str(col).strip() if col is not None else '' for col in next(rows, ())]
+        yield header, (worksheet.max_row - 1 if worksheet.max_row else None)
+        chunk = []
+        for row in rows:
+            if not any(value is not None and value != '' for value in row):
+                continue  # Boş satır
+            chunk.append(dict(zip(header, row)))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    finally:
+        workbook.close()
+
+def excel_cell_text(value):
+    """Excel hücresini metin sütununa uygun değere çevir"""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))  # 10099810779.0 -> '10099810779'
+    if hasattr(value, 'strftime') and not hasattr(value, 'year'):
+        return value.strftime('%H:%M')  # datetime.time (ör. Arıza Süresi)
+    return str(value)
+
+# Değişiklik özetinde listelenecek en fazla güncellenen bülten numarası
+IMPORT_DIFF_SAMPLE_SIZE = 100
+
+def new_import_summary():
+    """Excel içe aktarma fark özeti"""
+    return {
+        'inserted': 0,
+        'updated': 0,
+        'unchanged': 0,
+        'skipped': 0,
+        'changed_columns': {},
+        'updated_bulten_nos': []
+    }
+
+def import_summary_message(summary):
+    """Fark özetini kullanıcı mesajına çevir"""
+    parts = [f"{summary['inserted']} yeni kayıt eklendi"]
+    if summary['updated'] or summary['unchanged']:
+        parts.append(f"{summary['updated']} kayıt güncellendi, {summary['unchanged']} kayıt değişmedi")
+    if summary['skipped']:
+        parts.append(f"{summary['skipped']} mevcut kayıt atlandı")
+    return ', '.join(parts)
+
+def import_excel_chunk(connection, rows, summary, update_changed=False):
+    """
+    Bir parça Excel satırını toplu yaz ve summary sayaçlarını güncelle.
+    Mevcut numaralar parça başına tek sütunlu bir IN sorgusuyla (unique indeks
+    üzerinden) bulunur. Varsayılan modda mevcut bültenler atlanır;
+    update_changed=True ise satırın içerik özeti kayıttakiyle karşılaştırılır,
+    yalnızca özeti farklı olan kayıtların bülten sütunları güncellenir
+    (Excel'de olmayan koordinat, açıklama vb. alanlara dokunulmaz).
+    Core INSERT/UPDATE ORM hook'larını tetiklemediği için tipli alanlar,
+    row_version, içerik özeti, veri versiyonu ve rollup burada doldurulur.
+    """
+    table = FiberAriza.__table__
+    new_rows = {}
+    for row in rows:
+        bulten_no = excel_cell_text(row.get('Bülten Numarası'))
+        bulten_no = bulten_no.strip() if bulten_no else ''
+        if bulten_no and bulten_no not in new_rows:
+            new_rows[bulten_no] = row
+    if not new_rows:
+        return
+    existing = {
+        row.bulten_no: row
+        for row in connection.execute(
+            select(table.c.id, table.c.bulten_no, table.c.content_hash).where(table.c.bulten_no.in_(list(new_rows)))
+        )
+    }
+    if not update_changed:
+        for bulten_no in existing:
+            del new_rows[bulten_no]
+        summary['skipped'] += len(existing)
+        if not new_rows:
+            return
+
+    # Tarih sütunları parça başına toplu (vektörel) ayrıştırılır
+    baslangic = datetimes_to_python(parse_datetime_series([row.get('Arıza Başlangıç') for row in new_rows.values()]))
+    bitis = datetimes_to_python(parse_datetime_series([row.get('Arıza Bitiş') for row in new_rows.values()]))
+
+    inserts = []
+    candidates = {}
+    for (bulten_no, row), start, end in zip(new_rows.items(), baslangic, bitis):
+        record = {column: excel_cell_text(row.get(header)) for header, column in EXCEL_IMPORT_COLUMNS.items()}
+        record['bulten_no'] = bulten_no
+        record['ariza_baslangic'] = start
+        record['ariza_bitis'] = end
+        record['content_hash'] = content_hash(record.get)
+        old = existing.get(bulten_no)
+        if old is None:
+            inserts.append(record)
+        elif old.content_hash != record['content_hash']:
+            candidates[old.id] = record
+        else:
+            summary['unchanged'] += 1
+
+    # Özeti farklı (veya henüz hesaplanmamış) kayıtlar tek sorguyla tam olarak çekilir
+    updates = []
+    backfill = []
+    if candidates:
+        for old in connection.execute(select(table).where(table.c.id.in_(list(candidates)))):
+            old = dict(old._mapping)
+            record = candidates[old['id']]
+            if old['content_hash'] is None and content_hash(old.get) == record['content_hash']:
+                backfill.append({'row_id': old['id'], 'row_hash': record['content_hash']})
+            else:
+                updates.append((old, record))
+    if backfill:
+        connection.execute(
+            table.update().where(table.c.id == bindparam('row_id')).values(content_hash=bindparam('row_hash')),
+            backfill
+        )
+        summary['unchanged'] += len(backfill)
+    if not inserts and not updates:
+        return
+
+    version = bump_data_version(connection)
+    now = datetime.utcnow()
+    rollup = {}
+
+    def add_to_rollup(get, sign):
+        key, tallies = rollup_entry(get)
+        totals = rollup.setdefault(tuple(key.items()), dict.fromkeys(tallies, 0))
+        for name, count in tallies.items():
+            totals[name] += sign * count
+
+    for record in inserts:
+        record.update(dict.fromkeys(EXCEL_IMPORT_EMPTY_FIELDS, ''))
+        record.update(typed_field_values(record.get), row_version=version, updated_at=now)
+        add_to_rollup(record.get, 1)
+
+    update_params = []
+    for old, record in updates:
+        merged = {**old, **record}
+        values = {**record, **typed_field_values(merged.get), 'row_version': version, 'updated_at': now}
+        merged.update(values)
+        add_to_rollup(old.get, -1)
+        add_to_rollup(merged.get, 1)
+
+        changed_columns = summary['changed_columns']
+        for column in CONTENT_HASH_COLUMNS:
+            if (old[column] or '') != (record[column] or ''):
+                changed_columns[column] = changed_columns.get(column, 0) + 1
+        if len(summary['updated_bulten_nos']) < IMPORT_DIFF_SAMPLE_SIZE:
+            summary['updated_bulten_nos'].append(record['bulten_no'])
+
+        del values['bulten_no']
+        values['row_id'] = old['id']
+        update_params.append(values)
+
+    if inserts:
+        connection.execute(table.insert(), inserts)
+    if update_params:
+        connection.execute(table.update().where(table.c.id == bindparam('row_id')), update_params)
+    for group_key, totals in rollup.items():
+        if any(totals.values()):
+            apply_rollup_delta(connection, dict(group_key), totals)
+    summary['inserted'] += len(inserts)
+    summary['updated'] += len(update_params)
+
+def iter_excel_import(file, update_changed=False):
+    """
+    Excel dosyasını parça parça içe aktar; her parça commit edildikten sonra
+    (okunan satır, tahmini toplam satır, fark özeti) üretir.
+    Her parça kendi transaction'ında yazılır; yarıda kalan bir yükleme
+    tekrarlandığında yazılmış bültenler atlanır (değişiklik modunda özetleri
+    aynı olduğu için dokunulmaz). Zorunlu sütun eksikse ValueError.
+    """
+    chunks = iter_excel_chunks(file)
+    header, total_rows = next(chunks)
+    for col in EXCEL_IMPORT_COLUMNS:
+        if col not in header:
+            raise ValueError(f"Excel'de '{col}' sütunu eksik!")
+
+    read_rows = 0
+    summary = new_import_summary()
+    for rows in chunks:
+        import_excel_chunk(db.session.connection(), rows, summary, update_changed=update_changed)
+        db.session.commit()
+        read_rows += len(rows)
+        yield read_rows, total_rows, summary
+
+@job_handler('excel_import')
+def excel_import_job(job_id, params, progress):
+    summary = new_import_summary()
+    for read_rows, total_rows, summary in iter_excel_import(params['path'], params.get('update_changed', False)):
+        progress(read_rows, total_rows, f'{read_rows} satır işlendi, {summary["inserted"]} yeni, {summary["updated"]} güncellendi')
+    return {
+        'result': summary,
+        'message': import_summary_message(summary)
+    }
+
 @app.route('/upload_excel', methods=['POST'])
 def upload_excel():
     if 'excel_file' not in request.files:
@@ -452,92 +1486,33 @@ def upload_excel():
         flash('Geçersiz dosya', 'danger')
         return redirect(url_for('browse'))
 
-    try:
-        import pandas as pd
-        df = pd.read_excel(file)
-        df.columns = [str(col).strip() for col in df.columns]
-        required_columns = [
-            'Hafta', 'Bölge', 'Bülten Numarası', 'İL', 'Güzergah', 'Lokasyon',
-            'Arıza Başlangıç', 'Arıza Bitiş', 'Arıza Konsolide Kök Neden', 'Arıza Kök Neden',
-            'HAGS Aşıldı mı', 'Refakat Durumu', 'Servis Etkisi', 'Arıza Süresi'
-        ]
-        for col in required_columns:
-            if col not in df.columns:
-                flash(f"Excel'de '{col}' sütunu eksik!", 'danger')
-                return redirect(url_for('browse'))
+    # mode=diff: mevcut bültenlerden içeriği değişenleri güncelle
+    update_changed = request.values.get('mode') == 'diff'
 
-        existing_nos = {x.bulten_no for x in FiberAriza.query.all()}
-        new_count = 0
+    if wants_async():
+        # Dosya istek bitmeden diske yazılır, içe aktarma arka planda yapılır
+        job_id = uuid.uuid4().hex
+        path = os.path.join(job_dir(job_id), 'upload.xlsx')
+        file.save(path)
+        params = {'path': path, 'filename': file.filename, 'update_changed': update_changed}
+        return job_accepted(submit_job('excel_import', params, job_id=job_id))
 
-        def parse_date(val):
-            if pd.isnull(val):
-                return None
-            try:
-                # Türkçe ay isimlerini İngilizce'ye çevir
-                tr_months = {
-                    'Ocak': 'January', 'Şubat': 'February', 'Mart': 'March',
-                    'Nisan': 'April', 'Mayıs': 'May', 'Haziran': 'June',
-                    'Temmuz': 'July', 'Ağustos': 'August', 'Eylül': 'September',
-                    'Ekim': 'October', 'Kasım': 'November', 'Aralık': 'December'
-                }
-                val_str = str(val)
-                for tr, en in tr_months.items():
-                    val_str = val_str.replace(tr, en)
-                return pd.to_datetime(val_str, format='%d %B %Y %H:%M:%S')
-            except Exception:
-                try:
-                    return pd.to_datetime(val)
-                except Exception:
-                    return None
-
-        for _, row in df.iterrows():
-            bulten_no = str(row.get('Bülten Numarası', '')).strip()
-            if not bulten_no or bulten_no in existing_nos:
-                continue
-
-            new_ariza = FiberAriza(
-                hafta=row.get('Hafta', ''),
-                bolge=row.get('Bölge', ''),
-                bulten_no=bulten_no,
-                il=row.get('İL', ''),
-                guzergah=row.get('Güzergah', ''),
-                lokasyon=row.get('Lokasyon', ''),
-                ariza_baslangic=parse_date(row.get('Arıza Başlangıç')),
-                ariza_bitis=parse_date(row.get('Arıza Bitiş')),
-                ariza_konsolide=row.get('Arıza Konsolide Kök Neden', ''),
-                ariza_kok_neden=row.get('Arıza Kök Neden', ''),
-                hags_asildi_mi=row.get('HAGS Aşıldı mı', ''),
-                refakat_durumu=row.get('Refakat Durumu', ''),
-                servis_etkisi=row.get('Servis Etkisi', ''),
-                ariza_suresi=row.get('Arıza Süresi', ''),
-                # 9 yeni alanı boş bırak
-                kordinat_a='',
-                kordinat_b='',
-                serivs_etkisi='',
-                kablo_tipi='',
-                hags_suresi='',
-                kesinti_suresi='',
-                kalici_cozum='',
-                kullanilan_malzeme='',
-                aciklama=''
-            )
-            db.session.add(new_ariza)
-            new_count += 1
-
-        db.session.commit()
-        flash(f'{new_count} yeni kayıt başarıyla eklendi', 'success')
+    summary = new_import_summary()
+    try:
+        for _, _, summary in iter_excel_import(file, update_changed=update_changed):
+            pass
+        flash(import_summary_message(summary), 'success')
     except Exception as e:
         db.session.rollback()
-        flash(f'Hata: {str(e)}', 'danger')
+        written = summary['inserted'] + summary['updated']
+        flash(f'Hata: {str(e)} ({import_summary_message(summary)})' if written else f'Hata: {str(e)}', 'danger')
     return redirect(url_for('browse'))
 
 @app.route('/dashboard')
 def dashboard():
-    total = FiberAriza.query.count()
-    incomplete = FiberAriza.query.filter(
-        (FiberAriza.kordinat_a == '') |
-        (FiberAriza.kalici_cozum == '')
-    ).count()
+    stats = get_fault_stats()
+    total = stats['total']
+    incomplete = stats['incomplete']
     arizalar = FiberAriza.query.order_by(FiberAriza.ariza_baslangic.desc()).limit(10).all()
     return render_template('dashboard.html',
                          total=total,
@@ -556,92 +1531,317 @@ def delete_ariza(id):
         flash(f'Hata: {str(e)}', 'danger')
     return redirect(url_for('browse'))
 
+def ariza_to_dict(a):
+    """FiberAriza kaydını API formatına (camelCase) çevir"""
+    return {
+        'id': a.id,
+        'hafta': a.hafta,
+        'bolge': a.bolge,
+        'bultenNo': a.bulten_no,
+        'il': a.il,
+        'guzergah': a.guzergah,
+        'lokasyon': a.lokasyon,
+        'arizaBaslangic': a.ariza_baslangic.isoformat() if a.ariza_baslangic else '',
+        'arizaBitis': a.ariza_bitis.isoformat() if a.ariza_bitis else '',
+        'arizaKonsolide': a.ariza_konsolide,
+        'arizaKokNeden': a.ariza_kok_neden,
+        'hagsAsildi': a.hags_asildi_mi,
+        'refakatDurumu': a.refakat_durumu,
+        'servisEtkisi': a.servis_etkisi,
+        'arizaSuresi': a.ariza_suresi,
+        'kordinatA': a.kordinat_a,
+        'kordinatB': a.kordinat_b,
+        'etkilenenServisBilgileri': a.etkilenen_servis_bilgileri,
+        'kabloTipi': a.kablo_tipi,
+        'hagsSuresi': a.hags_suresi,
+        'kesintiSuresi': a.kesinti_suresi,
+        'kaliciCozum': a.kalici_cozum,
+        'kullanilanMalzeme': a.kullanilan_malzeme,
+        'aciklama': a.aciklama,
+        'refakatSaglandiMi': a.refakat_saglandi_mi,
+        'deplaseIslahIhtiyaci': a.deplase_islah_ihtiyaci,
+        'hasarTazminSureci': a.hasar_tazmin_sureci,
+        'otdrOlcumBilgileri': a.otdr_olcum_bilgileri,
+        'yil': a.yil
+    }
+
+# API alan adı (camelCase) -> FiberAriza sütun adı
+ARIZA_API_FIELDS = {
+    'id': 'id',
+    'hafta': 'hafta',
+    'bolge': 'bolge',
+    'bultenNo': 'bulten_no',
+    'il': 'il',
+    'guzergah': 'guzergah',
+    'lokasyon': 'lokasyon',
+    'arizaBaslangic': 'ariza_baslangic',
+    'arizaBitis': 'ariza_bitis',
+    'arizaKonsolide': 'ariza_konsolide',
+    'arizaKokNeden': 'ariza_kok_neden',
+    'hagsAsildi': 'hags_asildi_mi',
+    'refakatDurumu': 'refakat_durumu',
+    'servisEtkisi': 'servis_etkisi',
+    'arizaSuresi': 'ariza_suresi',
+    'kordinatA': 'kordinat_a',
+    'kordinatB': 'kordinat_b',
+    'etkilenenServisBilgileri': 'etkilenen_servis_bilgileri',
+    'kabloTipi': 'kablo_tipi',
+    'hagsSuresi': 'hags_suresi',
+    'kesintiSuresi': 'kesinti_suresi',
+    'kaliciCozum': 'kalici_cozum',
+    'kullanilanMalzeme': 'kullanilan_malzeme',
+    'aciklama': 'aciklama',
+    'refakatSaglandiMi': 'refakat_saglandi_mi',
+    'deplaseIslahIhtiyaci': 'deplase_islah_ihtiyaci',
+    'hasarTazminSureci': 'hasar_tazmin_sureci',
+    'otdrOlcumBilgileri': 'otdr_olcum_bilgileri',
+    'yil': 'yil'
+}
+
+def parse_ariza_fields(raw_fields):
+    """
+    fields parametresini (isim, sütun) çiftlerine çevir.
+    'bultenNo,bolge' gibi virgüllü metin veya liste kabul eder;
+    camelCase API adları ve model sütun adları (bulten_no) geçerlidir.
+    Bilinmeyen alan için ValueError fırlatır.
+    """
+    if isinstance(raw_fields, str):
+        raw_fields = raw_fields.split(',')
+    column_names = FiberAriza.__table__.columns.keys()
+    selected = []
+    for name in raw_fields:
+        name = str(name).strip()
+        if not name or name in dict(selected):
+            continue
+        column_name = ARIZA_API_FIELDS.get(name) or (name if name in column_names else None)
+        if column_name is None:
+            raise ValueError(f'Bilinmeyen alan: {name}')
+        selected.append((name, getattr(FiberAriza, column_name)))
+    if not selected:
+        raise ValueError('En az bir alan seçilmelidir')
+    return selected
+
+def select_ariza_fields(fields, *criteria):
+    """
+    Sadece seçilen sütunları çeken select() sorgusu oluştur.
+    ORM nesnesi yerine hafif satırlar döner; büyük Text sütunları
+    istenmedikçe okunmaz.
+    """
+    return select(*[column.label(name) for name, column in fields]).where(*criteria)
+
+def ariza_filter_criteria(bolge=None, kalici_cozum=None):
+    """bolge / kalici_cozum query parametrelerinden filtre koşulları oluştur"""
+    criteria = []
+    if bolge:
+        criteria.append(FiberAriza.bolge == bolge)
+    if kalici_cozum:
+        criteria.append(FiberAriza.kalici_cozum == kalici_cozum)
+    return criteria
+
+# ariza_to_dict boş tarihleri '' olarak döndürür; projeksiyonlar da aynı biçimi kullanır
+ARIZA_DATE_FIELDS = {'arizaBaslangic', 'arizaBitis', 'ariza_baslangic', 'ariza_bitis'}
+
+def projected_row_to_dict(row):
+    """Projeksiyon satırını ariza_to_dict ile aynı biçimde dict'e çevir (tarihler ISO formatında)"""
+    result = {}
+    for key, value in row._mapping.items():
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif value is None and key in ARIZA_DATE_FIELDS:
+            value = ''
+        result[key] = value
+    return result
+
+def stream_ndjson(rows, serializer, batch_size=STREAM_BATCH_SIZE):
+    """
+    Satırları NDJSON (satır başına bir JSON) olarak akıt.
+    rows yield_per ile çekilen bir sorgu olmalı ki tüm tablo belleğe alınmasın.
+    """
+    def generate():
+        buffer = []
+        for row in rows:
+            buffer.append(json.dumps(serializer(row), ensure_ascii=False))
+            if len(buffer) >= batch_size:
+                yield '\n'.join(buffer) + '\n'
+                buffer = []
+        if buffer:
+            yield '\n'.join(buffer) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+def encode_cursor(values):
+    """Cursor değerlerini opak bir token'a çevir"""
+    raw = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(token):
+    """Opak cursor token'ını çöz, geçersizse ValueError fırlat"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except Exception:
+        raise ValueError('Geçersiz cursor')
+
+def playground_data_count(module_id):
+    """
+    Playground modülünün kayıt sayısı.
+    COUNT(*) her sayfada değil, modülün veri versiyonu değiştiğinde bir kez
+    çalışır (arıza sayıları get_fault_stats'tan gelir).
+    """
+    version = get_data_version(playground_version_name(module_id))
+    cached = _playground_count_cache.get(module_id)
+    if cached and cached[0] == version:
+        return cached[1]
+    count = PlaygroundData.query.filter_by(module_id=module_id).count()
+    _playground_count_cache[module_id] = (version, count)
+    return count
+
+def keyset_page_arizalar(limit, cursor, fields=None):
+    """
+    (ariza_baslangic, id) üzerinde azalan sırada keyset pagination.
+    Başlangıç tarihi boş olan kayıtlar en sona gelir ve id ile sıralanır.
+    fields verilirse FiberAriza nesneleri yerine projeksiyon satırları döner;
+    cursor için gereken sütunlar '_' önekli etiketlerle eklenir.
+    """
+    limit = min(max(limit, 1), MAX_PAGE_SIZE)
+    baslangic, last_id = None, None
+    if cursor:
+        baslangic_str, last_id = decode_cursor(cursor)
+        baslangic = datetime.fromisoformat(baslangic_str) if baslangic_str else None
+
+    def fetch(criteria, order_by, count):
+        if fields is None:
+            return FiberAriza.query.filter(*criteria).order_by(*order_by).limit(count).all()
+        stmt = select_ariza_fields(fields, *criteria).add_columns(
+            FiberAriza.ariza_baslangic.label('_ariza_baslangic'),
+            FiberAriza.id.label('_id')
+        )
+        return db.session.execute(stmt.order_by(*order_by).limit(count)).all()
+
+    rows = []
+    # 1) Tarihi dolu kayıtlar (cursor tarihi boşsa bu kısım zaten bitmiştir)
+    if cursor is None or baslangic is not None:
+        criteria = [FiberAriza.ariza_baslangic.isnot(None)]
+        if baslangic is not None:
+            criteria.append(tuple_(FiberAriza.ariza_baslangic, FiberAriza.id) < tuple_(baslangic, last_id))
+        rows = fetch(criteria, (FiberAriza.ariza_baslangic.desc(), FiberAriza.id.desc()), limit + 1)
+
+    # 2) Tarihi boş kayıtlar
+    if len(rows) <= limit:
+        criteria = [FiberAriza.ariza_baslangic.is_(None)]
+        if cursor is not None and baslangic is None:
+            criteria.append(FiberAriza.id < last_id)
+        rows += fetch(criteria, (FiberAriza.id.desc(),), limit + 1 - len(rows))
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        last_baslangic, last_id = (
+            (last.ariza_baslangic, last.id) if fields is None else (last._ariza_baslangic, last._id)
+        )
+        next_cursor = encode_cursor([last_baslangic.isoformat() if last_baslangic else None, last_id])
+    return rows, next_cursor
+
+def projected_page_row_to_dict(row):
+    """Sayfalama için eklenen '_' önekli yardımcı sütunlar olmadan projeksiyon satırı"""
+    return {key: value for key, value in projected_row_to_dict(row).items() if not key.startswith('_')}
+
 @app.route('/api/arizalar')
+@etag_by_data_version
 def api_arizalar():
+    # ?fields=bultenNo,bolge ile her modda sadece istenen sütunlar çekilir
+    fields = None
+    if request.args.get('fields'):
+        try:
+            fields = parse_ariza_fields(request.args['fields'])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+    # Cursor pagination: ?limit=50&cursor=<next_cursor>
+    limit = request.args.get('limit', type=int)
+    if limit is not None:
+        try:
+            rows, next_cursor = keyset_page_arizalar(limit, request.args.get('cursor') or None, fields)
+        except (ValueError, TypeError):
+            return jsonify({'error': 'Geçersiz cursor'}), 400
+        result = {
+            'data': [ariza_to_dict(a) if fields is None else projected_page_row_to_dict(a) for a in rows],
+            'next_cursor': next_cursor
+        }
+        if request.args.get('include_total') == '1':
+            result['approx_total'] = get_fault_stats()['total']
+        return jsonify(result)
+
     # Pagination parametrelerini kontrol et
     page = request.args.get('page', type=int)
     per_page = request.args.get('per_page', type=int)
     
     # Eğer pagination parametreleri yoksa, tüm kayıtları döndür (mevcut davranış)
     if page is None or per_page is None:
+        if fields is not None:
+            stmt = select_ariza_fields(fields).order_by(FiberAriza.id)
+            if request.args.get('format') == 'ndjson':
+                rows = db.session.execute(stmt.execution_options(yield_per=STREAM_BATCH_SIZE))
+                return stream_ndjson(rows, projected_row_to_dict)
+            return jsonify([projected_row_to_dict(r) for r in db.session.execute(stmt)])
+
+        # ?format=ndjson ile kayıtlar parça parça akıtılır
+        if request.args.get('format') == 'ndjson':
+            rows = FiberAriza.query.order_by(FiberAriza.id).yield_per(STREAM_BATCH_SIZE)
+            return stream_ndjson(rows, ariza_to_dict)
         arizalar = FiberAriza.query.all()
-        return jsonify([{
-            'id': a.id,
-            'hafta': a.hafta,
-            'bolge': a.bolge,
-            'bultenNo': a.bulten_no,
-            'il': a.il,
-            'guzergah': a.guzergah,
-            'lokasyon': a.lokasyon,
-            'arizaBaslangic': a.ariza_baslangic.isoformat() if a.ariza_baslangic else '',
-            'arizaBitis': a.ariza_bitis.isoformat() if a.ariza_bitis else '',
-            'arizaKonsolide': a.ariza_konsolide,
-            'arizaKokNeden': a.ariza_kok_neden,
-            'hagsAsildi': a.hags_asildi_mi,
-            'refakatDurumu': a.refakat_durumu,
-            'servisEtkisi': a.servis_etkisi,
-            'arizaSuresi': a.ariza_suresi,
-            'kordinatA': a.kordinat_a,
-            'kordinatB': a.kordinat_b,
-            'etkilenenServisBilgileri': a.etkilenen_servis_bilgileri,
-            'kabloTipi': a.kablo_tipi,
-            'hagsSuresi': a.hags_suresi,
-            'kesintiSuresi': a.kesinti_suresi,
-            'kaliciCozum': a.kalici_cozum,
-            'kullanilanMalzeme': a.kullanilan_malzeme,
-            'aciklama': a.aciklama,
-            'refakatSaglandiMi': a.refakat_saglandi_mi,
-            'deplaseIslahIhtiyaci': a.deplase_islah_ihtiyaci,
-            'hasarTazminSureci': a.hasar_tazmin_sureci,
-            'otdrOlcumBilgileri': a.otdr_olcum_bilgileri,
-            'yil': a.yil
-        } for a in arizalar])
+        return jsonify([ariza_to_dict(a) for a in arizalar])
     
     # Pagination parametreleri varsa, paginated response döndür
-    pagination = FiberAriza.query.paginate(
-        page=page, 
-        per_page=per_page, 
-        error_out=False
-    )
+    if fields is not None:
+        # Sayfa id'ler üzerinden bulunur, sadece o sayfanın seçili sütunları çekilir
+        pagination = db.paginate(select(FiberAriza.id).order_by(FiberAriza.id),
+                                 page=page, per_page=per_page, error_out=False)
+        stmt = select_ariza_fields(fields, FiberAriza.id.in_(pagination.items)).order_by(FiberAriza.id)
+        data = [projected_row_to_dict(r) for r in db.session.execute(stmt)]
+    else:
+        pagination = FiberAriza.query.paginate(
+            page=page, 
+            per_page=per_page, 
+            error_out=False
+        )
+        data = [ariza_to_dict(a) for a in pagination.items]
     
     return jsonify({
-        'data': [{
-            'id': a.id,
-            'hafta': a.hafta,
-            'bolge': a.bolge,
-            'bultenNo': a.bulten_no,
-            'il': a.il,
-            'guzergah': a.guzergah,
-            'lokasyon': a.lokasyon,
-            'arizaBaslangic': a.ariza_baslangic.isoformat() if a.ariza_baslangic else '',
-            'arizaBitis': a.ariza_bitis.isoformat() if a.ariza_bitis else '',
-            'arizaKonsolide': a.ariza_konsolide,
-            'arizaKokNeden': a.ariza_kok_neden,
-            'hagsAsildi': a.hags_asildi_mi,
-            'refakatDurumu': a.refakat_durumu,
-            'servisEtkisi': a.servis_etkisi,
-            'arizaSuresi': a.ariza_suresi,
-            'kordinatA': a.kordinat_a,
-            'kordinatB': a.kordinat_b,
-            'etkilenenServisBilgileri': a.etkilenen_servis_bilgileri,
-            'kabloTipi': a.kablo_tipi,
-            'hagsSuresi': a.hags_suresi,
-            'kesintiSuresi': a.kesinti_suresi,
-            'kaliciCozum': a.kalici_cozum,
-            'kullanilanMalzeme': a.kullanilan_malzeme,
-            'aciklama': a.aciklama,
-            'refakatSaglandiMi': a.refakat_saglandi_mi,
-            'deplaseIslahIhtiyaci': a.deplase_islah_ihtiyaci,
-            'hasarTazminSureci': a.hasar_tazmin_sureci,
-            'otdrOlcumBilgileri': a.otdr_olcum_bilgileri,
-            'yil': a.yil
-        } for a in pagination.items],
+        'data': data,
         'total': pagination.total,
         'page': pagination.page,
         'pages': pagination.pages,
         'per_page': pagination.per_page
     })
 
+@app.route('/api/arizalar/changes')
+@etag_by_data_version
+def api_arizalar_changes():
+    """
+    Delta sync: ?since=<versiyon> sonrasında eklenen/güncellenen kayıtlar
+    ve silinen kayıtların id'leri. Dönen 'version' bir sonraki istekte
+    since olarak gönderilmelidir.
+    """
+    since = request.args.get('since', type=int)
+    if since is None:
+        return jsonify({'error': 'since parametresi gerekli'}), 400
+
+    version = get_data_version()
+    upserted = FiberAriza.query.filter(FiberAriza.row_version > since).order_by(FiberAriza.row_version).all()
+    deleted = db.session.execute(
+        select(FiberArizaTombstone.ariza_id).where(FiberArizaTombstone.version > since)
+    ).scalars().all()
+    upserted_ids = {a.id for a in upserted}
+
+    return jsonify({
+        'version': version,
+        'upserted': [ariza_to_dict(a) for a in upserted],
+        'deleted': [ariza_id for ariza_id in deleted if ariza_id not in upserted_ids]
+    })
+
 @app.route('/api/ariza', methods=['POST'])
 def api_add_ariza():
     data = request.get_json()
@@ -650,43 +1850,15 @@ def api_add_ariza():
     app.logger.info(f"POST - Gelen veri: {data}")
     
     try:
+        values = parse_ariza_payload(data)
+        values.setdefault('yil', str(datetime.now().year))
+
         # Bülten numarası kontrolü
-        existing = FiberAriza.query.filter_by(bulten_no=data.get('bultenNo')).first()
+        existing = FiberAriza.query.filter_by(bulten_no=values['bulten_no']).first()
         if existing:
             return jsonify({'error': 'Bu Bülten Numarası zaten mevcut!'}), 400
         
-        ariza = FiberAriza(
-            hafta=data.get('hafta'),
-            bolge=data.get('bolge'),
-            bulten_no=data.get('bultenNo'),
-            il=data.get('il'),
-            guzergah=data.get('guzergah'),
-            lokasyon=data.get('lokasyon'),
-            ariza_baslangic=datetime.fromisoformat(data.get('baslangicTarihi')) if data.get('baslangicTarihi') else None,
-            ariza_bitis=datetime.fromisoformat(data.get('bitisTarihi')) if data.get('bitisTarihi') else None,
-            ariza_konsolide=data.get('arizaKonsolide'),
-            ariza_kok_neden=data.get('kokNeden'),
-            hags_asildi_mi=data.get('hags'),
-            refakat_durumu=data.get('refakatDurumu'),
-            servis_etkisi=data.get('servisEtkisi'),
-            ariza_suresi=data.get('arizaSuresi'),
-            # Son 14 alan
-            kordinat_a=data.get('kordinatA', ''),
-            kordinat_b=data.get('kordinatB', ''),
-            serivs_etkisi=data.get('serivsEtkisi', ''),  # Eski alan (typo ile)
-            etkilenen_servis_bilgileri=data.get('etkilenenServisBilgileri', ''),  # Yeni alan
-            kablo_tipi=data.get('kabloTipi', ''),
-            hags_suresi=data.get('hagsSuresi', ''),
-            kesinti_suresi=data.get('kesintiSuresi', ''),
-            kalici_cozum=data.get('kaliciCozum', ''),
-            kullanilan_malzeme=data.get('kullanilanMalzeme', ''),
-            aciklama=data.get('aciklama', ''),
-            refakat_saglandi_mi=data.get('refakatSaglandiMi', ''),
-            deplase_islah_ihtiyaci=data.get('deplaseIslahIhtiyaci', ''),
-            hasar_tazmin_sureci=data.get('hasarTazminSureci', ''),
-            otdr_olcum_bilgileri=data.get('otdrOlcumBilgileri', ''),
-            yil=data.get('yil', str(datetime.now().year))
-        )
+        ariza = FiberAriza(**values)
         
         db.session.add(ariza)
         db.session.commit()
@@ -706,9 +1878,14 @@ def api_update_ariza(id):
     # Debug için
     app.logger.info(f"PUT - Gelen veri: {data}")
     
+    try:
+        values = parse_ariza_payload(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
     # Kendi ID'sini hariç tutarak kontrol et
     existing = FiberAriza.query.filter(
-        FiberAriza.bulten_no == data.get('bultenNo'),
+        FiberAriza.bulten_no == values['bulten_no'],
         FiberAriza.id != id
     ).first()
     
@@ -716,37 +1893,8 @@ def api_update_ariza(id):
         return jsonify({'error': 'Bu Bülten Numarası ile başka bir kayıt var!'}), 400
 
     try:
-        # İlk 14 alan
-        ariza.hafta = data.get('hafta')
-        ariza.bolge = data.get('bolge')
-        ariza.bulten_no = data.get('bultenNo')
-        ariza.il = data.get('il')
-        ariza.guzergah = data.get('guzergah')
-        ariza.lokasyon = data.get('lokasyon')
-        ariza.ariza_baslangic = parse_utc_date(data.get('baslangicTarihi'))
-        ariza.ariza_bitis = parse_utc_date(data.get('bitisTarihi'))
-        ariza.ariza_konsolide = data.get('arizaKonsolide')
-        ariza.ariza_kok_neden = data.get('kokNeden')
-        ariza.hags_asildi_mi = data.get('hags')
-        ariza.refakat_durumu = data.get('refakatDurumu')
-        ariza.servis_etkisi = data.get('servisEtkisi')
-        ariza.ariza_suresi = data.get('arizaSuresi')
-        
-        # Son 14 alan
-        ariza.kordinat_a = data.get('kordinatA', '')
-        ariza.kordinat_b = data.get('kordinatB', '')
-        ariza.serivs_etkisi = data.get('serivsEtkisi', '')  # Eski alan
-        ariza.etkilenen_servis_bilgileri = data.get('etkilenenServisBilgileri', '')  # Yeni alan
-        ariza.kablo_tipi = data.get('kabloTipi', '')
-        ariza.hags_suresi = data.get('hagsSuresi', '')
-        ariza.kesinti_suresi = data.get('kesintiSuresi', '')
-        ariza.kalici_cozum = data.get('kaliciCozum', '')
-        ariza.kullanilan_malzeme = data.get('kullanilanMalzeme', '')
-        ariza.aciklama = data.get('aciklama', '')
-        ariza.refakat_saglandi_mi = data.get('refakatSaglandiMi', '')
-        ariza.deplase_islah_ihtiyaci = data.get('deplaseIslahIhtiyaci', '')
-        ariza.hasar_tazmin_sureci = data.get('hasarTazminSureci', '')
-        ariza.otdr_olcum_bilgileri = data.get('otdrOlcumBilgileri', '')
+        for column, value in values.items():
+            setattr(ariza, column, value)
         
         db.session.commit()
         return jsonify({'status': 'ok', 'message': 'Güncelleme başarılı'})
@@ -756,7 +1904,125 @@ def api_update_ariza(id):
         app.logger.error(f"Güncelleme hatası: {str(e)}")
         return jsonify({'error': str(e)}), 400
 
+def bulk_upsert_chunk(chunk):
+    """
+    Bir parça kaydı bulten_no üzerinden INSERT ... ON CONFLICT DO UPDATE ile yaz.
+    Core INSERT ORM hook'larını tetiklemediği için tipli alanlar, row_version,
+    veri versiyonu ve rollup burada elle güncellenir. Mevcut kayıtlar parça
+    başına tek sorguyla çekilir; değişmeyen kayıtlara dokunulmaz.
+
+    Args:
+        chunk: (sıra, parse_ariza_payload çıktısı) listesi
+
+    Returns:
+        Her kayıt için durum sözlüğü listesi
+    """
+    table = FiberAriza.__table__
+    connection = db.session.connection()
+    bulten_nos = {values['bulten_no'] for _, values in chunk}
+    existing = {
+        row.bulten_no: dict(row._mapping)
+        for row in connection.execute(select(table).where(table.c.bulten_no.in_(bulten_nos)))
+    }
+
+    version = None
+    now = datetime.utcnow()
+    results = []
+    for index, values in chunk:
+        old = existing.get(values['bulten_no'])
+        if old is not None and all(old[column] == value for column, value in values.items()):
+            results.append({'index': index, 'bultenNo': values['bulten_no'], 'id': old['id'], 'status': 'unchanged'})
+            continue
+        if old is None:
+            values.setdefault('yil', str(datetime.now().year))
+        if version is None:
+            version = bump_data_version(connection)
+
+        merged = {**(old or {}), **values}
+        values.update(typed_field_values(merged.get), row_version=version, updated_at=now)
+        values['content_hash'] = content_hash(merged.get)
+        merged.update(values)
+
+        stmt = sqlite_insert(table).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['bulten_no'],
+            set_={column: stmt.excluded[column] for column in values if column != 'bulten_no'}
+        ).returning(table.c.id)
+        merged['id'] = connection.execute(stmt).scalar()
+
+        new_entry = rollup_entry(merged.get)
+        old_entry = rollup_entry(old.get) if old is not None else None
+        if old_entry != new_entry:
+            if old_entry is not None:
+                apply_rollup_delta(connection, *old_entry, sign=-1)
+            apply_rollup_delta(connection, *new_entry)
+
+        existing[values['bulten_no']] = merged
+        results.append({
+            'index': index,
+            'bultenNo': values['bulten_no'],
+            'id': merged['id'],
+            'status': 'updated' if old is not None else 'inserted'
+        })
+    return results
+
+def write_bulk_chunk(chunk):
+    """Parçayı kendi transaction'ında yaz; hata olursa parçadaki tüm kayıtları hatalı işaretle"""
+    try:
+        results = bulk_upsert_chunk(chunk)
+        db.session.commit()
+        return results
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Toplu upsert hatası: {str(e)}")
+        return [
+            {'index': index, 'bultenNo': values['bulten_no'], 'status': 'error', 'error': str(e)}
+            for index, values in chunk
+        ]
+
+@app.route('/api/ariza/bulk', methods=['POST'])
+@login_required
+def api_bulk_upsert_ariza():
+    """
+    Toplu arıza ekleme/güncelleme (bulten_no anahtarlı upsert).
+    Gövde JSON dizisi ya da NDJSON (Content-Type: application/x-ndjson) olabilir;
+    NDJSON satır satır okunur. Kayıtlar BULK_CHUNK_SIZE'lık parçalar halinde
+    ayrı transaction'larda yazılır ve her kayıt için durum döner:
+    inserted / updated / unchanged / error.
+    """
+    ndjson = request.mimetype == 'application/x-ndjson'
+    if ndjson:
+        records = (line for line in request.stream if line.strip())
+    else:
+        records = request.get_json(silent=True)
+        if not isinstance(records, list):
+            return jsonify({'error': 'Gövde bir JSON dizisi veya NDJSON olmalıdır'}), 400
+
+    results = []
+    chunk = []
+    for index, record in enumerate(records):
+        try:
+            values = parse_ariza_payload(json.loads(record) if ndjson else record)
+        except ValueError as e:
+            results.append({'index': index, 'status': 'error', 'error': str(e)})
+            continue
+        chunk.append((index, values))
+        if len(chunk) >= BULK_CHUNK_SIZE:
+            results.extend(write_bulk_chunk(chunk))
+            chunk = []
+    if chunk:
+        results.extend(write_bulk_chunk(chunk))
+
+    results.sort(key=lambda result: result['index'])
+    summary = {status: 0 for status in ('inserted', 'updated', 'unchanged', 'error')}
+    for result in results:
+        summary[result['status']] += 1
+
+    log_database_operation('BULK_UPSERT', 'FiberAriza', record_id=None, data=summary)
+    return jsonify({'status': 'ok', 'summary': summary, 'results': results})
+
 @app.route('/api/filter_data')
+@etag_by_data_version
 def api_filter_data():
     """Filtre dropdown'ları için unique değerleri döndür"""
     try:
@@ -816,84 +2082,160 @@ def edit_ariza(id):
         return redirect(url_for('browse'))
     return render_template('edit.html', ariza=ariza)
 
+# Toplu KMZ export tipleri -> indirme dosya adı
+KMZ_EXPORT_TYPES = {
+    'all': 'tum_arizalar.kmz',
+    'solved': 'cozulen_arizalar.kmz',
+    'unsolved': 'cozulmemis_arizalar.kmz',
+}
+
+def kmz_export_criteria(export_type):
+    """Toplu KMZ export tipinin filtre koşulları (koordinatı olmayanlar SQL seviyesinde elenir)"""
+    criteria = [FiberAriza.lat.isnot(None), FiberAriza.lon.isnot(None)]
+    if export_type == 'solved':
+        criteria.append(FiberAriza.kalici_cozum == 'Evet')
+    elif export_type == 'unsolved':
+        # != yerine aralık karşılaştırması: kalici_cozum indeksi kullanılabilsin
+        criteria.append(
+            (FiberAriza.kalici_cozum < 'Evet') | (FiberAriza.kalici_cozum > 'Evet') |
+            (FiberAriza.kalici_cozum == None)
+        )
+    return criteria
+
+def kmz_export_query(export_type):
+    """Toplu KMZ export tipinin sorgusu"""
+    return FiberAriza.query.filter(*kmz_export_criteria(export_type))
+
+# KMZ placemark'ları için okunan sütunlar (toplu export'ta ORM nesnesi kurulmaz)
+KMZ_COLUMNS = (
+    'bulten_no', 'hafta', 'bolge', 'il', 'guzergah', 'lokasyon', 'ariza_baslangic',
+    'ariza_bitis', 'ariza_kok_neden', 'kalici_cozum', 'aciklama', 'lat', 'lon'
+)
+
+# KMZ'de <Folder> gruplaması yapılabilecek alanlar (?group=bolge,il)
+KMZ_GROUP_FIELDS = ('bolge', 'il')
+
+KMZ_STYLES = {
+    'solved': 'http://maps.google.com/mapfiles/ms/icons/green-dot.png',
+    'unsolved': 'http://maps.google.com/mapfiles/ms/icons/red-dot.png',
+}
+
+def parse_kmz_group(value):
+    """?group= parametresini doğrula: '' -> (), 'bolge,il' -> ('bolge', 'il')"""
+    fields = tuple(field.strip() for field in (value or '').split(',') if field.strip())
+    for field in fields:
+        if field not in KMZ_GROUP_FIELDS:
+            raise ValueError(f'Geçersiz gruplama alanı: {field}')
+    return fields
+
+def kmz_export_rows(export_type, group_by=()):
+    """Toplu KMZ export satırları; gruplama varsa klasörler sırayla yazılabilsin diye sıralı"""
+    query = kmz_export_query(export_type).with_entities(*[getattr(FiberAriza, column) for column in KMZ_COLUMNS])
+    if group_by:
+        query = query.order_by(*[getattr(FiberAriza, field) for field in group_by], FiberAriza.id)
+    return query
+
+def kmz_description(ariza):
+    """Placemark açıklaması (HTML)"""
+    return (
+        f"<b>Bülten No:</b> {ariza.bulten_no}<br>"
+        f"<b>Hafta:</b> {ariza.hafta or ''}<br>"
+        f"<b>Bölge:</b> {ariza.bolge or ''}<br>"
+        f"<b>İl:</b> {ariza.il or ''}<br>"
+        f"<b>Güzergah:</b> {ariza.guzergah or ''}<br>"
+        f"<b>Lokasyon:</b> {ariza.lokasyon or ''}<br>"
+        f"<b>Başlangıç:</b> {ariza.ariza_baslangic or ''}<br>"
+        f"<b>Bitiş:</b> {ariza.ariza_bitis or ''}<br>"
+        f"<b>Kök Neden:</b> {ariza.ariza_kok_neden or ''}<br>"
+        f"<b>Kalıcı Çözüm:</b> {ariza.kalici_cozum or ''}<br>"
+        f"<b>Açıklama:</b> {ariza.aciklama or 'Yok'}<br>"
+    )
+
+def write_kmz(arizalar, output, progress=None, total=None, group_by=()):
+    """
+    Arızaları KMZ olarak output'a (dosya yolu veya BytesIO) akışlı yaz.
+    arizalar yield_per ile çekilen bir sorgu olabilir; placemark'lar okundukça
+    zip içine yazılır. group_by verilirse (ör. ('bolge', 'il')) kayıtlar bu
+    alanlara göre sıralı gelmeli; her değer değişiminde iç içe <Folder> açılır.
+    """
+    with KmzWriter(output, name='Fiber Arızalar', styles=KMZ_STYLES) as kmz:
+        current = []
+        for index, ariza in enumerate(arizalar, 1):
+            if progress and index % STREAM_BATCH_SIZE == 0:
+                progress(index, total, f'{index} kayıt işlendi')
+            if ariza.lat is None or ariza.lon is None:
+                continue
+
+            if group_by:
+                values = [getattr(ariza, field) or 'Belirtilmemiş' for field in group_by]
+                depth = 0
+                while depth < len(current) and current[depth] == values[depth]:
+                    depth += 1
+                while kmz.folder_depth > depth:
+                    kmz.close_folder()
+                for value in values[depth:]:
+                    kmz.open_folder(value)
+                current = values
+
+            kmz.placemark(
+                f"Arıza #{ariza.bulten_no}",
+                ariza.lon,
+                ariza.lat,
+                style_id='solved' if ariza.kalici_cozum == 'Evet' else 'unsolved',
+                description=kmz_description(ariza)
+            )
+
+@job_handler('kmz_export')
+def kmz_export_job(job_id, params, progress):
+    export_type = params['export_type']
+    group_by = tuple(params.get('group_by', ()))
+    query = kmz_export_rows(export_type, group_by)
+    filename = KMZ_EXPORT_TYPES[export_type]
+    path = os.path.join(job_dir(job_id), filename)
+    _, cached_path = cached_export(
+        'kmz', {'export_type': export_type, 'group_by': list(group_by)},
+        lambda output: write_kmz(query.yield_per(STREAM_BATCH_SIZE), output, progress,
+                                 total=query.count(), group_by=group_by),
+        '.kmz'
+    )
+    shutil.copyfile(cached_path, path)
+    return {'result_path': path, 'result_name': filename, 'result_mimetype': 'application/vnd.google-earth.kmz'}
+
 # KMZ Export Fonksiyonu
 @app.route('/export_kmz/<string:export_type>')
 def export_kmz(export_type='all'):
     """
     KMZ dosyası olarak export et
     export_type: 'all', 'solved', 'unsolved', veya ID
+    ?group=bolge veya ?group=bolge,il ile toplu export'lar klasörlere ayrılır
+    ?async=1 ile toplu export'lar arka plan işi olarak çalışır
     """
     try:
-        # Verileri filtrele
-        if export_type == 'all':
-            arizalar = FiberAriza.query.all()
-            filename = 'tum_arizalar.kmz'
-        elif export_type == 'solved':
-            arizalar = FiberAriza.query.filter(FiberAriza.kalici_cozum == 'Evet').all()
-            filename = 'cozulen_arizalar.kmz'
-        elif export_type == 'unsolved':
-            arizalar = FiberAriza.query.filter(
-                (FiberAriza.kalici_cozum != 'Evet') | (FiberAriza.kalici_cozum == None)
-            ).all()
-            filename = 'cozulmemis_arizalar.kmz'
-        else:
-            # Tek bir arıza
-            ariza = FiberAriza.query.get_or_404(int(export_type))
-            arizalar = [ariza]
-            filename = f'ariza_{ariza.bulten_no}.kmz'
-        
-        # KML oluştur
-        kml = simplekml.Kml()
-        
-        # Stiller tanımla
-        solved_style = simplekml.Style()
-        solved_style.iconstyle.icon.href = 'http://maps.google.com/mapfiles/ms/icons/green-dot.png'
-        
-        unsolved_style = simplekml.Style()
-        unsolved_style.iconstyle.icon.href = 'http://maps.google.com/mapfiles/ms/icons/red-dot.png'
-        
-        for ariza in arizalar:
-            if ariza.kordinat_a and ariza.kordinat_b:
-                try:
-                    # Koordinatları parse et
-                    lat = float(ariza.kordinat_a.replace(',', '.'))
-                    lon = float(ariza.kordinat_b.replace(',', '.'))
-                    
-                    # Placemark oluştur
-                    pnt = kml.newpoint(name=f"Arıza #{ariza.bulten_no}")
-                    pnt.coords = [(lon, lat)]
-                    
-                    # Stil ata
-                    if ariza.kalici_cozum == 'Evet':
-                        pnt.style = solved_style
-                    else:
-                        pnt.style = unsolved_style
-                    
-                    # Açıklama ekle
-                    description = f"""
-                    <![CDATA[
-                    <b>Bülten No:</b> {ariza.bulten_no}<br>
-                    <b>Hafta:</b> {ariza.hafta}<br>
-                    <b>Bölge:</b> {ariza.bolge}<br>
-                    <b>İl:</b> {ariza.il}<br>
-                    <b>Güzergah:</b> {ariza.guzergah}<br>
-                    <b>Lokasyon:</b> {ariza.lokasyon}<br>
-                    <b>Başlangıç:</b> {ariza.ariza_baslangic}<br>
-                    <b>Bitiş:</b> {ariza.ariza_bitis}<br>
-                    <b>Kök Neden:</b> {ariza.ariza_kok_neden}<br>
-                    <b>Kalıcı Çözüm:</b> {ariza.kalici_cozum}<br>
-                    <b>Açıklama:</b> {ariza.aciklama or 'Yok'}<br>
-                    ]]>
-                    """
-                    pnt.description = description
-                    
-                except ValueError:
-                    # Geçersiz koordinat
-                    continue
+        group_by = parse_kmz_group(request.args.get('group'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if export_type in KMZ_EXPORT_TYPES and wants_async():
+        return job_accepted(submit_job('kmz_export', {'export_type': export_type, 'group_by': list(group_by)}))
+
+    try:
+        # Toplu export'lar veri versiyonu değişmedikçe önbellekten gönderilir
+        if export_type in KMZ_EXPORT_TYPES:
+            query = kmz_export_rows(export_type, group_by)
+            key, path = cached_export(
+                'kmz', {'export_type': export_type, 'group_by': list(group_by)},
+                lambda output: write_kmz(query.yield_per(STREAM_BATCH_SIZE), output, group_by=group_by),
+                '.kmz'
+            )
+            return send_cached_export(key, path, 'application/vnd.google-earth.kmz', KMZ_EXPORT_TYPES[export_type])
+
+        # Tek bir arıza
+        ariza = FiberAriza.query.get_or_404(int(export_type))
+        arizalar = [ariza]
+        filename = f'ariza_{ariza.bulten_no}.kmz'
         
-        # KMZ olarak kaydet
         output = BytesIO()
-        kml.savekmz(output)
+        write_kmz(arizalar, output)
         output.seek(0)
         
         return send_file(
@@ -907,122 +2249,530 @@ def export_kmz(export_type='all'):
         flash(f'KMZ export hatası: {str(e)}', 'danger')
         return redirect(url_for('browse'))
 
-# Harita API endpoint'i
-@app.route('/api/map_data')
-def api_map_data():
-    """Harita için arıza verilerini döndür (filtreli)"""
-    bolge = request.args.get('bolge')
-    kalici_cozum = request.args.get('kalici_cozum')
-    query = FiberAriza.query.filter(
-        FiberAriza.kordinat_a != '',
-        FiberAriza.kordinat_b != ''
-    )
-    if bolge:
-        query = query.filter_by(bolge=bolge)
-    if kalici_cozum:
-        query = query.filter_by(kalici_cozum=kalici_cozum)
-    arizalar = query.all()
-    markers = []
-    for ariza in arizalar:
+# Harita kümeleme: bu zoom ve üstünde ya da bbox'ta MAP_CLUSTER_MIN_POINTS'ten
+# az kayıt varsa tek tek marker döner, aksi halde ızgara kümeleri
+MAP_CLUSTER_MAX_ZOOM = 15
+MAP_CLUSTER_MIN_POINTS = 300
+MAP_CLUSTER_CELL_PX = 60   # Küme hücresinin ekrandaki yaklaşık genişliği (piksel)
+
+def parse_bbox(value):
+    """
+    'batı,güney,doğu,kuzey' (GeoJSON sırası) -> (west, south, east, north); geçersizse ValueError.
+    180. meridyeni kesen görünümlerde (düşük zoom) batı doğudan büyük olabilir.
+    """
+    try:
+        west, south, east, north = (float(part) for part in value.split(','))
+    except ValueError:
+        raise ValueError('bbox "batı,güney,doğu,kuzey" biçiminde dört sayı olmalı')
+    if not (-180 <= west <= 180 and -180 <= east <= 180 and -90 <= south <= north <= 90):
+        raise ValueError('bbox sınırları geçersiz')
+    return west, south, east, north
+
+def map_cluster_cell_size(zoom):
+    """Zoom seviyesine göre küme hücresi boyu (derece); 256 px'lik Web Mercator karolarına göre"""
+    return 360.0 / (256 * 2 ** zoom) * MAP_CLUSTER_CELL_PX
+
+def map_data_criteria(bolge=None, kalici_cozum=None, bbox=None, use_rtree=None):
+    """Harita sorgularının filtre koşulları: koordinatlı kayıtlar, bolge / kalici_cozum ve isteğe bağlı bbox"""
+    criteria = [FiberAriza.lat.isnot(None), FiberAriza.lon.isnot(None)]
+    criteria += ariza_filter_criteria(bolge, kalici_cozum)
+    if bbox is not None:
+        criteria += bbox_criteria(bbox, use_rtree)
+    return criteria
+
+def map_cluster_stmt(criteria, zoom):
+    """
+    Kayıtları SQL'de sabit (global) bir ızgaraya göre gruplayan sorgu; hücre başına
+    (sayı, ortalama lat, ortalama lon, çözülen sayısı, en küçük id) döner.
+    """
+    cell = map_cluster_cell_size(zoom)
+    row_index = cast((FiberAriza.lat + 90) / cell, db.Integer)
+    col_index = cast((FiberAriza.lon + 180) / cell, db.Integer)
+    return select(
+        func.count(FiberAriza.id),
+        func.avg(FiberAriza.lat),
+        func.avg(FiberAriza.lon),
+        func.sum(case((FiberAriza.kalici_cozum == 'Evet', 1), else_=0)),
+        func.min(FiberAriza.id)
+    ).where(*criteria).group_by(row_index, col_index)
+
+def map_clusters(criteria, zoom):
+    """
+    Hücre başına ağırlık merkezi, sayı ve çözülen/çözülmeyen dağılımı döner.
+    Hücreler bbox'tan bağımsız hizalandığı için harita kaydırıldığında kümeler sabit kalır.
+    """
+    clusters = []
+    for count, lat, lon, solved, first_id in db.session.execute(map_cluster_stmt(criteria, zoom)):
+        cluster = {
+            'lat': round(lat, 6),
+            'lng': round(lon, 6),
+            'count': count,
+            'solved': solved,
+            'unsolved': count - solved
+        }
+        if count == 1:
+            cluster['id'] = first_id
+        clusters.append(cluster)
+    return clusters
+
+def map_markers(criteria, fields=None):
+    """Tek tek marker listesi; fields verilirse açıklamada sadece istenen alanlar olur"""
+    if fields:
+        stmt = select_ariza_fields(fields, *criteria).add_columns(
+            FiberAriza.id.label('_id'),
+            FiberAriza.bulten_no.label('_bulten_no'),
+            FiberAriza.lat.label('_lat'),
+            FiberAriza.lon.label('_lon')
+        )
+        markers = []
+        for row in db.session.execute(stmt):
+            marker = {
+                'id': row._id,
+                'lat': row._lat,
+                'lng': row._lon,
+                'title': f"Arıza #{row._bulten_no}"
+            }
+            marker.update({
+                key: value for key, value in projected_row_to_dict(row).items()
+                if not key.startswith('_')
+            })
+            markers.append(marker)
+        return markers
+
+    markers = []
+    for ariza in FiberAriza.query.filter(*criteria):
+        markers.append({
+            'id': ariza.id,
+            'lat': ariza.lat,
+            'lng': ariza.lon,
+            'title': f"Arıza #{ariza.bulten_no}",
+            'bultenNo': ariza.bulten_no,
+            'hafta': ariza.hafta,
+            'bolge': ariza.bolge,
+            'il': ariza.il,
+            'guzergah': ariza.guzergah,
+            'lokasyon': ariza.lokasyon,
+            'baslangic': ariza.ariza_baslangic.isoformat() if ariza.ariza_baslangic else '',
+            'bitis': ariza.ariza_bitis.isoformat() if ariza.ariza_bitis else '',
+            'kokNeden': ariza.ariza_kok_neden,
+            'kaliciCozum': ariza.kalici_cozum,
+            'aciklama': ariza.aciklama
+        })
+    return markers
+
+# Harita API endpoint'i
+@app.route('/api/map_data')
+@etag_by_data_version
+def api_map_data():
+    """
+    Harita için arıza verilerini döndür (filtreli).
+    ?bbox=batı,güney,doğu,kuzey yalnızca görünen alanı döndürür.
+    ?zoom= verilirse yanıt {"type": "clusters" | "markers", ...} nesnesidir:
+    düşük zoom'da ızgara kümeleri, yakınlaşınca tek tek marker'lar.
+    zoom verilmezse eskisi gibi marker listesi döner.
+    """
+    bolge = request.args.get('bolge')
+    kalici_cozum = request.args.get('kalici_cozum')
+
+    try:
+        # ?fields= verilirse marker'a sadece istenen açıklama alanları eklenir
+        fields = parse_ariza_fields(request.args['fields']) if request.args.get('fields') else None
+        bbox = parse_bbox(request.args['bbox']) if request.args.get('bbox') else None
+        criteria = map_data_criteria(bolge, kalici_cozum, bbox)
+        zoom = request.args.get('zoom', type=int)
+        if zoom is not None and not 0 <= zoom <= 22:
+            raise ValueError('zoom 0-22 arasında olmalı')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if zoom is None:
+        return jsonify(map_markers(criteria, fields))
+
+    total = db.session.execute(select(func.count(FiberAriza.id)).where(*criteria)).scalar()
+    if zoom < MAP_CLUSTER_MAX_ZOOM and total > MAP_CLUSTER_MIN_POINTS:
+        return jsonify({
+            'type': 'clusters',
+            'zoom': zoom,
+            'total': total,
+            'cellSize': map_cluster_cell_size(zoom),
+            'clusters': map_clusters(criteria, zoom)
+        })
+    return jsonify({
+        'type': 'markers',
+        'zoom': zoom,
+        'total': total,
+        'markers': map_markers(criteria, fields)
+    })
+
+NEARBY_DEFAULT_RADIUS_KM = 0.5
+NEARBY_MAX_RADIUS_KM = 50
+NEARBY_MAX_LIMIT = 1000
+
+@app.route('/api/ariza/<int:id>/nearby')
+@etag_by_data_version
+def api_nearby_arizalar(id):
+    """
+    Bir arızanın çevresindeki diğer arızalar, yakından uzağa sıralı.
+    ?radius_km=0.5 (en fazla NEARBY_MAX_RADIUS_KM), ?limit=100.
+    Adaylar mekansal indeksten kutu sorgusuyla gelir, mesafe haversine ile süzülür.
+    """
+    ariza = FiberAriza.query.get_or_404(id)
+    if ariza.lat is None or ariza.lon is None:
+        return jsonify({'error': 'Arızanın koordinatı yok'}), 400
+
+    radius_km = request.args.get('radius_km', NEARBY_DEFAULT_RADIUS_KM, type=float)
+    limit = request.args.get('limit', 100, type=int)
+    if not 0 < radius_km <= NEARBY_MAX_RADIUS_KM:
+        return jsonify({'error': f'radius_km 0-{NEARBY_MAX_RADIUS_KM} arasında olmalı'}), 400
+    if not 0 < limit <= NEARBY_MAX_LIMIT:
+        return jsonify({'error': f'limit 1-{NEARBY_MAX_LIMIT} arasında olmalı'}), 400
+
+    stmt = select(
+        FiberAriza.id, FiberAriza.bulten_no, FiberAriza.lat, FiberAriza.lon,
+        FiberAriza.guzergah, FiberAriza.lokasyon, FiberAriza.ariza_baslangic,
+        FiberAriza.ariza_kok_neden, FiberAriza.kalici_cozum
+    ).where(FiberAriza.id != ariza.id, *bbox_criteria(radius_bbox(ariza.lat, ariza.lon, radius_km)))
+
+    nearby = []
+    for row in db.session.execute(stmt):
+        distance_km = haversine_km(ariza.lat, ariza.lon, row.lat, row.lon)
+        if distance_km > radius_km:
+            continue  # Kutunun köşelerinde kalanlar
+        nearby.append({
+            'id': row.id,
+            'bultenNo': row.bulten_no,
+            'lat': row.lat,
+            'lng': row.lon,
+            'distanceM': round(distance_km * 1000, 1),
+            'guzergah': row.guzergah,
+            'lokasyon': row.lokasyon,
+            'baslangic': row.ariza_baslangic.isoformat() if row.ariza_baslangic else '',
+            'kokNeden': row.ariza_kok_neden,
+            'kaliciCozum': row.kalici_cozum
+        })
+    nearby.sort(key=lambda item: item['distanceM'])
+
+    return jsonify({
+        'id': ariza.id,
+        'bultenNo': ariza.bulten_no,
+        'radiusKm': radius_km,
+        'total': len(nearby),
+        'nearby': nearby[:limit]
+    })
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Tam Excel export'unun 28 sütunu: (başlık, FiberAriza alanı)
+EXCEL_EXPORT_COLUMNS = (
+    # İlk 14 alan - Input verileri
+    ('Hafta', 'hafta'),
+    ('Bölge', 'bolge'),
+    ('Bülten Numarası', 'bulten_no'),
+    ('İl', 'il'),
+    ('Güzergah', 'guzergah'),
+    ('Lokasyon', 'lokasyon'),
+    ('Arıza Başlangıç', 'ariza_baslangic'),
+    ('Arıza Bitiş', 'ariza_bitis'),
+    ('Arıza Konsolide Kök Neden', 'ariza_konsolide'),
+    ('Arıza Kök Neden', 'ariza_kok_neden'),
+    ('HAGS Aşıldı mı?', 'hags_asildi_mi'),
+    ('Refakat Durumu', 'refakat_durumu'),
+    ('Servis Etkisi', 'servis_etkisi'),
+    ('Arıza Süresi', 'ariza_suresi'),
+    # Son 14 alan - Düzenlenebilir alanlar
+    ('KORDİNAT A', 'kordinat_a'),
+    ('KORDİNAT B', 'kordinat_b'),
+    ('ETKİLENEN SERVİS BİLGİLERİ', 'etkilenen_servis_bilgileri'),
+    ('KABLO TİPİ', 'kablo_tipi'),
+    ('HAGS SÜRESİ', 'hags_suresi'),
+    ('KESİNTİ SÜRESİ', 'kesinti_suresi'),
+    ('KALICI ÇÖZÜM SAĞLANDI', 'kalici_cozum'),
+    ('KULLANILAN MALZEME', 'kullanilan_malzeme'),
+    ('AÇIKLAMA', 'aciklama'),
+    ('Refakat Sağlandı mı?', 'refakat_saglandi_mi'),
+    ('Deplase Islah İhtiyacı var mı', 'deplase_islah_ihtiyaci'),
+    ('Hasar Tazmin Süreci', 'hasar_tazmin_sureci'),
+    ('OTDR Ölçüm Bilgileri', 'otdr_olcum_bilgileri'),
+    ('YIL', 'yil'),
+)
+
+EXCEL_COLUMN_MAX_WIDTH = 50
+
+def write_excel_all(output, progress=None):
+    """
+    Tüm verileri (28 alan) Excel olarak output dosya yoluna yaz.
+    Kayıtlar sunucu taraflı imleçle (yield_per) okunur ve XlsxWriter'ın
+    constant_memory modunda satır satır yazılır; tablonun bellekte kopyası
+    tutulmaz. Sütun genişlikleri yazarken izlenen en uzun değerden hesaplanır.
+    """
+    import xlsxwriter
+    columns = [column for _, column in EXCEL_EXPORT_COLUMNS]
+    date_indexes = [columns.index('ariza_baslangic'), columns.index('ariza_bitis')]
+    yil_index = columns.index('yil')
+    default_year = str(datetime.now().year)
+    total = db.session.query(func.count(FiberAriza.id)).scalar() if progress else None
+    rows = db.session.execute(
+        select(*[getattr(FiberAriza, column) for column in columns])
+        .order_by(FiberAriza.id)
+        .execution_options(yield_per=STREAM_BATCH_SIZE)
+    )
+
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+    try:
+        worksheet = workbook.add_worksheet('Fiber Arızalar')
+        header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+        headers = [header for header, _ in EXCEL_EXPORT_COLUMNS]
+        worksheet.write_row(0, 0, headers, header_format)
+        widths = [len(header) for header in headers]
+
+        for index, row in enumerate(rows, 1):
+            values = list(row)
+            for i in date_indexes:
+                values[i] = values[i].strftime('%d %B %Y %H:%M:%S') if values[i] else ''
+            values[yil_index] = values[yil_index] or default_year
+            for i, value in enumerate(values):
+                if value is not None:
+                    widths[i] = max(widths[i], len(str(value)))
+            worksheet.write_row(index, 0, values)
+            if progress and index % STREAM_BATCH_SIZE == 0:
+                progress(index, total, f'{index} kayıt yazıldı')
+
+        # Sütun genişliklerini ayarla (constant_memory modunda da kapanışta yazılır)
+        for i, width in enumerate(widths):
+            worksheet.set_column(i, i, min(width + 2, EXCEL_COLUMN_MAX_WIDTH))
+    finally:
+        workbook.close()
+
+@job_handler('excel_export_all')
+def excel_export_all_job(job_id, params, progress):
+    filename = f'fiber_arizalar_tam_{datetime.now().strftime("%Y%m%d_%H%M")}.xlsx'
+    path = os.path.join(job_dir(job_id), filename)
+    _, cached_path = cached_export('excel_all', {}, lambda output: write_excel_all(output, progress), '.xlsx')
+    shutil.copyfile(cached_path, path)
+    return {'result_path': path, 'result_name': filename, 'result_mimetype': XLSX_MIMETYPE}
+
+# Excel Export fonksiyonu (tüm data)
+@app.route('/export_excel_all')
+def export_excel_all():
+    """Tüm verileri Excel olarak export et - TÜM 28 ALAN (?async=1 ile arka plan işi)"""
+    if wants_async():
+        return job_accepted(submit_job('excel_export_all'))
+
+    # Veri versiyonu değişmedikçe önbellekteki dosya gönderilir
+    key, path = cached_export('excel_all', {}, write_excel_all, '.xlsx')
+    return send_cached_export(
+        key, path, XLSX_MIMETYPE,
+        f'fiber_arizalar_tam_{datetime.now().strftime("%Y%m%d_%H%M")}.xlsx'
+    )
+
+# Ham tablo export'ları (BI için): modeli olan fiber_ariza ve yalnızca
+# migration'larla oluşturulmuş, app.py'de modeli olmayan tablolar
+LEGACY_EXPORT_TABLES = ('deplase_islah', 'hasar_tazmin', 'kritik_modernizasyon', 'fttb_optimizasyon')
+
+# Parquet row group başına satır sayısı (yield_per parçaları birleştirilir)
+PARQUET_ROW_GROUP_SIZE = 50000
+
+_legacy_metadata = db.MetaData()
+
+def export_table(table_name):
+    """Export edilecek tabloyu döndür; modeli olmayanlar veritabanından yansıtılır"""
+    if table_name == FiberAriza.__tablename__:
+        return FiberAriza.__table__
+    if table_name not in LEGACY_EXPORT_TABLES:
+        return None
+    if table_name not in _legacy_metadata.tables:
+        if not inspect(db.engine).has_table(table_name):
+            return None
+        db.Table(table_name, _legacy_metadata, autoload_with=db.engine)
+    return _legacy_metadata.tables[table_name]
+
+def iter_table_partitions(table):
+    """Tabloyu sunucu taraflı imleçle STREAM_BATCH_SIZE'lık parçalar halinde oku"""
+    rows = db.session.execute(
+        select(table).order_by(*table.primary_key.columns).execution_options(yield_per=STREAM_BATCH_SIZE)
+    )
+    return rows.partitions()
+
+def column_python_type(column):
+    """Sütunun Python tipi; bilinmiyorsa None"""
+    try:
+        return column.type.python_type
+    except NotImplementedError:
+        return None
+
+def export_column_indexes(table):
+    """
+    (Decimal sütunları, metne düşen sütunlar) sıraları. NUMERIC sütunlar sayı
+    olarak, JSON gibi karşılığı olmayan tipler metin olarak yazılır.
+    """
+    from datetime import date
+    from decimal import Decimal
+    scalar_types = (int, float, bool, datetime, date, str, Decimal)
+    decimal_columns, text_columns = [], []
+    for index, column in enumerate(table.columns):
+        python_type = column_python_type(column)
+        if python_type is Decimal:
+            decimal_columns.append(index)
+        elif python_type not in scalar_types:
+            text_columns.append(index)
+    return decimal_columns, text_columns
+
+def export_text_value(value):
+    """Metne düşen değer: dict/list JSON olarak, diğerleri tırnaksız str() ile"""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    return str(value)
+
+def stream_table_csv(table):
+    """Tabloyu CSV olarak akıt (başlık satırı sütun adları)"""
+    import csv
+    from io import StringIO
+    _, text_columns = export_column_indexes(table)
+
+    def to_row(row):
+        if not text_columns:
+            return row
+        row = list(row)
+        for index in text_columns:
+            row[index] = export_text_value(row[index])
+        return row
+
+    def generate():
+        buffer = StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([column.name for column in table.columns])
+        for partition in iter_table_partitions(table):
+            writer.writerows(map(to_row, partition))
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    return Response(stream_with_context(generate()), mimetype='text/csv')
+
+class _ParquetSink:
+    """ParquetWriter çıktısını biriktiren, yazılan byte sayısını bilen akış"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+def parquet_schema(table):
+    """SQLAlchemy sütun tiplerinden Arrow şeması; bilinmeyen tipler metin olarak yazılır"""
+    import pyarrow as pa
+    from datetime import date
+    from decimal import Decimal
+    arrow_types = {
+        int: pa.int64(),
+        float: pa.float64(),
+        Decimal: pa.float64(),
+        bool: pa.bool_(),
+        datetime: pa.timestamp('us'),
+        date: pa.date32(),
+        str: pa.string(),
+    }
+    return pa.schema([
+        pa.field(column.name, arrow_types.get(column_python_type(column), pa.string()))
+        for column in table.columns
+    ])
+
+def stream_table_parquet(table):
+    """
+    Tabloyu Parquet olarak akıt. yield_per parçaları record batch'lere
+    çevrilir ve PARQUET_ROW_GROUP_SIZE satırlık row group'lar halinde yazılır;
+    her row group yazıldıkça istemciye gönderilir.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    schema = parquet_schema(table)
+    decimal_columns, text_columns = export_column_indexes(table)
+
+    def to_batch(partition):
+        columns = list(zip(*partition))
+        for index in decimal_columns:
+            columns[index] = [None if value is None else float(value) for value in columns[index]]
+        for index in text_columns:
+            columns[index] = [export_text_value(value) for value in columns[index]]
+        return pa.RecordBatch.from_arrays([pa.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema)
+
+    def generate():
+        sink = _ParquetSink()
+        writer = pq.ParquetWriter(pa.PythonFile(sink, mode='w'), schema)
+        batches = []
+        pending = 0
+        for partition in iter_table_partitions(table):
+            batches.append(to_batch(partition))
+            pending += len(partition)
+            if pending >= PARQUET_ROW_GROUP_SIZE:
+                writer.write_table(pa.Table.from_batches(batches, schema=schema))
+                batches = []
+                pending = 0
+                yield sink.drain()
+        if batches:
+            writer.write_table(pa.Table.from_batches(batches, schema=schema))
+        writer.close()
+        yield sink.drain()
+
+    return Response(stream_with_context(generate()), mimetype='application/vnd.apache.parquet')
+
+@app.route('/export/<string:table_name>.<any(csv, parquet):fmt>')
+def export_table_data(table_name, fmt):
+    """
+    Tabloyu CSV veya Parquet olarak akıt: /export/fiber_ariza.csv,
+    /export/hasar_tazmin.parquet ... Satırlar sunucu taraflı imleçle okunur,
+    tablo belleğe alınmaz. Parquet için pyarrow gerekir (opsiyonel bağımlılık).
+    """
+    table = export_table(table_name)
+    if table is None:
+        return jsonify({'error': f'Export edilemeyen tablo: {table_name}'}), 404
+
+    if fmt == 'parquet':
         try:
-            lat = float(ariza.kordinat_a.replace(',', '.'))
-            lon = float(ariza.kordinat_b.replace(',', '.'))
-            markers.append({
-                'id': ariza.id,
-                'lat': lat,
-                'lng': lon,
-                'title': f"Arıza #{ariza.bulten_no}",
-                'bultenNo': ariza.bulten_no,
-                'hafta': ariza.hafta,
-                'bolge': ariza.bolge,
-                'il': ariza.il,
-                'guzergah': ariza.guzergah,
-                'lokasyon': ariza.lokasyon,
-                'baslangic': ariza.ariza_baslangic.isoformat() if ariza.ariza_baslangic else '',
-                'bitis': ariza.ariza_bitis.isoformat() if ariza.ariza_bitis else '',
-                'kokNeden': ariza.ariza_kok_neden,
-                'kaliciCozum': ariza.kalici_cozum,
-                'aciklama': ariza.aciklama
-            })
-        except ValueError:
-            continue
-    return jsonify(markers)
+            import pyarrow  # noqa: F401
+        except ImportError:
+            return jsonify({'error': 'Parquet export için pyarrow kurulu değil (pip install pyarrow)'}), 501
+        response = stream_table_parquet(table)
+    else:
+        response = stream_table_csv(table)
 
-# Excel Export fonksiyonu (tüm data)
-@app.route('/export_excel_all')
-def export_excel_all():
-    """Tüm verileri Excel olarak export et - TÜM 28 ALAN"""
-    arizalar = FiberAriza.query.all()
-    
-    data = []
-    for ariza in arizalar:
-        data.append({
-            # İlk 14 alan - Input verileri
-            'Hafta': ariza.hafta,
-            'Bölge': ariza.bolge,
-            'Bülten Numarası': ariza.bulten_no,
-            'İl': ariza.il,
-            'Güzergah': ariza.guzergah,
-            'Lokasyon': ariza.lokasyon,
-            'Arıza Başlangıç': ariza.ariza_baslangic.strftime('%d %B %Y %H:%M:%S') if ariza.ariza_baslangic else '',
-            'Arıza Bitiş': ariza.ariza_bitis.strftime('%d %B %Y %H:%M:%S') if ariza.ariza_bitis else '',
-            'Arıza Konsolide Kök Neden': ariza.ariza_konsolide,
-            'Arıza Kök Neden': ariza.ariza_kok_neden,
-            'HAGS Aşıldı mı?': ariza.hags_asildi_mi,
-            'Refakat Durumu': ariza.refakat_durumu,
-            'Servis Etkisi': ariza.servis_etkisi,
-            'Arıza Süresi': ariza.ariza_suresi,
-            
-            # Son 14 alan - Düzenlenebilir alanlar
-            'KORDİNAT A': ariza.kordinat_a,
-            'KORDİNAT B': ariza.kordinat_b,
-            'ETKİLENEN SERVİS BİLGİLERİ': ariza.etkilenen_servis_bilgileri,
-            'KABLO TİPİ': ariza.kablo_tipi,
-            'HAGS SÜRESİ': ariza.hags_suresi,
-            'KESİNTİ SÜRESİ': ariza.kesinti_suresi,
-            'KALICI ÇÖZÜM SAĞLANDI': ariza.kalici_cozum,
-            'KULLANILAN MALZEME': ariza.kullanilan_malzeme,
-            'AÇIKLAMA': ariza.aciklama,
-            'Refakat Sağlandı mı?': ariza.refakat_saglandi_mi,
-            'Deplase Islah İhtiyacı var mı': ariza.deplase_islah_ihtiyaci,
-            'Hasar Tazmin Süreci': ariza.hasar_tazmin_sureci,
-            'OTDR Ölçüm Bilgileri': ariza.otdr_olcum_bilgileri,
-            'YIL': ariza.yil or str(datetime.now().year)
-        })
-    
-    df = pd.DataFrame(data)
-    output = BytesIO()
-    
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        df.to_excel(writer, sheet_name='Fiber Arızalar', index=False)
-        
-        # Sütun genişliklerini ayarla
-        worksheet = writer.sheets['Fiber Arızalar']
-        for i, col in enumerate(df.columns):
-            column_width = max(df[col].astype(str).map(len).max(), len(col)) + 2
-            worksheet.set_column(i, i, min(column_width, 50))  # Max 50 karakter
-    
-    output.seek(0)
-    
-    return send_file(
-        output,
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        as_attachment=True,
-        download_name=f'fiber_arizalar_tam_{datetime.now().strftime("%Y%m%d_%H%M")}.xlsx'
-    )
+    response.headers['Content-Disposition'] = f'attachment; filename={table_name}_{datetime.now().strftime("%Y%m%d")}.{fmt}'
+    log_file_operation('EXPORT', f'{table_name}.{fmt}')
+    return response
 
 @app.route('/export_excel_custom', methods=['POST'])
 def export_excel_custom():
     # Kullanıcıdan seçili başlıkları al
     selected_fields = request.json.get('fields', [])
-    arizalar = FiberAriza.query.all()
-    data = []
-    for ariza in arizalar:
-        row = {}
-        for field in selected_fields:
-            row[field] = getattr(ariza, field, '')
-        data.append(row)
-    df = pd.DataFrame(data)
+    try:
+        fields = parse_ariza_fields(selected_fields)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    # Sadece seçili sütunlar SQL seviyesinde çekilir
+    stmt = select_ariza_fields(fields).order_by(FiberAriza.id)
+    df = pd.DataFrame(db.session.execute(stmt).all(), columns=[name for name, _ in fields])
     output = BytesIO()
     with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
         df.to_excel(writer, sheet_name='Fiber Arızalar', index=False)
@@ -1037,14 +2787,16 @@ def export_excel_custom():
 @app.route('/api/arizalar_filtered')
 def api_arizalar_filtered():
     # Örnek: ?bolge=Bursa&kalici_cozum=Evet
-    query = FiberAriza.query
-    bolge = request.args.get('bolge')
-    kalici_cozum = request.args.get('kalici_cozum')
-    if bolge:
-        query = query.filter_by(bolge=bolge)
-    if kalici_cozum:
-        query = query.filter_by(kalici_cozum=kalici_cozum)
-    arizalar = query.all()
+    criteria = ariza_filter_criteria(request.args.get('bolge'), request.args.get('kalici_cozum'))
+    # ?fields= ile sadece istenen sütunlar çekilir
+    if request.args.get('fields'):
+        try:
+            fields = parse_ariza_fields(request.args['fields'])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        stmt = select_ariza_fields(fields, *criteria).order_by(FiberAriza.id)
+        return jsonify([projected_row_to_dict(r) for r in db.session.execute(stmt)])
+    arizalar = FiberAriza.query.filter(*criteria).all()
     return jsonify([{
         'id': a.id,
         'hafta': a.hafta,
@@ -1072,16 +2824,408 @@ def api_arizalar_filtered():
         'aciklama': a.aciklama
     } for a in arizalar])
 
+class LLMResponseCache(db.Model):
+    """
+    Model yanıt önbelleği. Anahtar (model, sıcaklık, normalize prompt, arıza
+    veri versiyonu) özetidir: arızalar değişince eski yanıtlar artık eşleşmez
+    ve bir sonraki yazmada silinir. Kayıtlar LLM_CACHE_TTL sonunda geçersiz
+    olur, LLM_CACHE_MAX_ENTRIES aşılınca en uzun süredir kullanılmayan silinir.
+    """
+    key = db.Column(db.String(40), primary_key=True)
+    model = db.Column(db.String(100), nullable=False)
+    data_version = db.Column(db.Integer, nullable=False, index=True)
+    response = db.Column(db.Text, nullable=False)
+    hits = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_used_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+LLM_CACHE_TTL = timedelta(hours=24)
+LLM_CACHE_MAX_ENTRIES = 1000
+_llm_cache_stats = {'hits': 0, 'misses': 0}  # Bu worker sürecindeki sayaçlar
+
+def llm_cache_key(prompt, temperature, version):
+    """Boşluk ve büyük/küçük harf farkları yok sayılarak prompt'un önbellek anahtarı"""
+    normalized = ' '.join(prompt.split()).casefold()
+    if temperature is None:
+        temperature = AI_CONFIG['temperature']
+    raw = json.dumps([llm.model, temperature, normalized, version], ensure_ascii=False)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+def llm_cache_get(key):
+    """Geçerli önbellek kaydının yanıtını döndür (kullanım sayacı ve zamanı güncellenir), yoksa None"""
+    table = LLMResponseCache.__table__
+    now = datetime.utcnow()
+    with db.engine.begin() as connection:
+        response = connection.execute(
+            table.update()
+            .where(table.c.key == key, table.c.created_at >= now - LLM_CACHE_TTL)
+            .values(hits=table.c.hits + 1, last_used_at=now)
+            .returning(table.c.response)
+        ).scalar()
+    _llm_cache_stats['hits' if response is not None else 'misses'] += 1
+    return response
+
+def llm_cache_put(key, version, response):
+    """Yanıtı önbelleğe yaz; süresi dolan, eski versiyona ait ve LRU sınırını aşan kayıtları sil"""
+    table = LLMResponseCache.__table__
+    now = datetime.utcnow()
+    with db.engine.begin() as connection:
+        stmt = sqlite_insert(table).values(
+            key=key, model=llm.model, data_version=version, response=response,
+            hits=0, created_at=now, last_used_at=now
+        )
+        connection.execute(stmt.on_conflict_do_update(
+            index_elements=['key'],
+            set_={'response': stmt.excluded.response, 'created_at': now, 'last_used_at': now}
+        ))
+        connection.execute(table.delete().where(
+            (table.c.created_at < now - LLM_CACHE_TTL) | (table.c.data_version < version)
+        ))
+        connection.execute(table.delete().where(table.c.key.in_(
+            select(table.c.key).order_by(table.c.last_used_at.desc()).offset(LLM_CACHE_MAX_ENTRIES)
+        )))
+
+def cached_llm_generate(prompt, temperature=None, use_cache=True, user_key=None, timeout=None, heartbeat=None):
+    """
+    llm.generate'in önbellekli hali. Versiyon üretimden önce okunur (bkz. cached_export).
+    use_cache=False önbelleği okumaz ama yeni yanıtı yine yazar. Yalnızca
+    önbellekte olmayan yanıtlar LLM kuyruğuna girer (LLMQueueRejected);
+    user_key ve timeout llm_slot'a iletilir. heartbeat(mesaj) verilirse (arka
+    plan işleri) kuyrukta beklerken ve üretim sırasında çağrılır; yanıt bu
+    durumda akışla toplanır.
+
+    Returns:
+        (yanıt, önbellekten geldi mi)
+    """
+    version = get_data_version()
+    key = llm_cache_key(prompt, temperature, version)
+    if use_cache:
+        response = llm_cache_get(key)
+        if response is not None:
+            return response, True
+    on_wait = None
+    if heartbeat is not None:
+        on_wait = lambda position: heartbeat(f"Yapay zekâ kuyruğunda {position}. sırada")
+    with llm_slot(user_key, timeout=timeout, on_wait=on_wait) as request_id:
+        if heartbeat is None:
+            response = llm.generate(prompt, temperature=temperature)
+        else:
+            response = collect_llm_stream(prompt, temperature, request_id, heartbeat)
+    if response:
+        llm_cache_put(key, version, response)
+    return response, False
+
+def collect_llm_stream(prompt, temperature, request_id, heartbeat):
+    """Yanıtı llm.stream ile topla; LLM_HEARTBEAT_INTERVAL'da bir kuyruk kaydını ve çağıranın heartbeat'ini yenile"""
+    heartbeat('Yanıt üretiliyor')
+    parts = []
+    touched = time.monotonic()
+    tokens = llm.stream(prompt, temperature=temperature)
+    try:
+        for token in tokens:
+            parts.append(token)
+            if time.monotonic() - touched > LLM_HEARTBEAT_INTERVAL:
+                touch_llm_request(request_id)
+                heartbeat('Yanıt üretiliyor')
+                touched = time.monotonic()
+    finally:
+        tokens.close()
+    return ''.join(parts)
+
+def llm_cache_bypassed():
+    """İstemci önbelleği atlamak istedi mi? (Cache-Control: no-cache veya ?fresh=1)"""
+    return 'no-cache' in request.headers.get('Cache-Control', '') or request.args.get('fresh') == '1'
+
+class LLMRequest(db.Model):
+    """
+    Bekleyen ve çalışan LLM üretimleri. Tüm gunicorn worker'ları ve arka plan
+    iş parçacıkları aynı tabloyu kullandığı için eşzamanlılık sınırı globaldir.
+    """
+    id = db.Column(db.String(32), primary_key=True)
+    user_key = db.Column(db.String(100), nullable=False, index=True)
+    status = db.Column(db.String(20), nullable=False, default='waiting', index=True)  # waiting, running
+    background = db.Column(db.Boolean, nullable=False, default=False)
+    pid = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime)
+
+# LLM kuyruğu: bekleyen web istekleri birer sync worker'ı tuttuğu için
+# LLM_MAX_IN_FLIGHT + LLM_MAX_WAITING worker sayısının (4) altında tutulur;
+# böylece yapay zekâ talebi ne olursa olsun CRUD ve harita istekleri için
+# en az bir worker boş kalır. Arka plan işleri worker tutmadığı için bekleme
+# sınırına takılmaz; kullanıcı adına kuyruğa alınan işler (rapor yeniden üretimi)
+# yine o kullanıcının kotasından düşer ve sırada en fazla LLM_JOB_WAIT_TIMEOUT bekler.
+LLM_MAX_IN_FLIGHT = 1         # Aynı anda çalışan üretim sayısı (tüm worker'larda)
+LLM_MAX_WAITING = 2           # Sırada bekleyebilecek web isteği sayısı
+LLM_MAX_PER_USER = 1          # Kullanıcı başına bekleyen + çalışan istek
+LLM_QUEUE_WAIT_TIMEOUT = 20   # Web isteğinin sırada en fazla bekleme süresi (saniye)
+LLM_JOB_WAIT_TIMEOUT = 120    # Kullanıcı adına çalışan işin sırada en fazla bekleme süresi
+LLM_HEARTBEAT_INTERVAL = 30   # Uzun üretimlerde kuyruk kaydı / iş heartbeat aralığı (saniye)
+LLM_QUEUE_POLL_INTERVAL = 0.25
+LLM_REQUEST_STALE_AFTER = 300  # Bu süre heartbeat gelmeyen kayıt sahipsiz sayılır
+
+class LLMQueueRejected(Exception):
+    """LLM isteği kuyruğa alınmadı (429: kullanıcı sınırı, 503: kuyruk dolu / bekleme süresi aşıldı)"""
+
+    def __init__(self, message, status_code, retry_after=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+def llm_user_key():
+    """Adil sıralama için istek sahibi: giriş yapmış kullanıcı, yoksa IP; istek dışında arka plan"""
+    if not has_request_context():
+        return 'background'
+    if current_user.is_authenticated:
+        return f"user:{current_user.get_id()}"
+    return f"ip:{request.remote_addr}"
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass  # Başka kullanıcının süreci: yaşıyor say
+    return True
+
+def release_stale_llm_requests(connection):
+    """Heartbeat'i kesilen veya süreci ölmüş kayıtları sil (worker yeniden başlatıldıysa)"""
+    table = LLMRequest.__table__
+    connection.execute(table.delete().where(
+        table.c.heartbeat_at < datetime.utcnow() - timedelta(seconds=LLM_REQUEST_STALE_AFTER)
+    ))
+    pids = connection.execute(select(table.c.pid).distinct().where(table.c.pid.isnot(None))).scalars().all()
+    dead = [pid for pid in pids if not _pid_alive(pid)]
+    if dead:
+        connection.execute(table.delete().where(table.c.pid.in_(dead)))
+
+def admit_llm_request(user_key=None):
+    """
+    İsteği kuyruğa al ve kayıt id'sini döndür. Sınır kontrolü ve ekleme tek
+    INSERT ... SELECT ile atomik yapılır; sınır doluysa LLMQueueRejected.
+    """
+    table = LLMRequest.__table__
+    user_key = user_key or llm_user_key()
+    background = not has_request_context()  # Worker tutmayan istek (arka plan işi)
+    request_id = uuid.uuid4().hex
+    now = datetime.utcnow()
+    user_active = select(func.count()).select_from(table).where(table.c.user_key == user_key).scalar_subquery()
+    web_waiting = select(func.count()).select_from(table).where(
+        table.c.status == 'waiting', table.c.background.is_(False)
+    ).scalar_subquery()
+    conditions = [] if user_key == 'background' else [user_active < LLM_MAX_PER_USER]
+    if not background:
+        conditions.append(web_waiting < LLM_MAX_WAITING)
+    source = select(
+        literal(request_id), literal(user_key), literal('waiting'), literal(background),
+        literal(os.getpid()), literal(now), literal(now)
+    ).where(*conditions)
+    with db.engine.begin() as connection:
+        release_stale_llm_requests(connection)
+        inserted = connection.execute(table.insert().from_select(
+            ['id', 'user_key', 'status', 'background', 'pid', 'created_at', 'heartbeat_at'], source
+        )).rowcount
+        if not inserted:
+            if user_key != 'background' and connection.execute(select(user_active)).scalar() >= LLM_MAX_PER_USER:
+                raise LLMQueueRejected('Önceki yapay zekâ isteğiniz henüz tamamlanmadı', 429, retry_after=5)
+            raise LLMQueueRejected('Yapay zekâ servisi şu anda yoğun, lütfen biraz sonra tekrar deneyin',
+                                   503, retry_after=LLM_QUEUE_WAIT_TIMEOUT)
+    return request_id
+
+def llm_queue_order(table):
+    """Bekleyenlerin sırası: çalışan isteği az olan kullanıcı önce, sonra geliş zamanı"""
+    other = table.alias('other')
+    user_running = select(func.count()).select_from(other).where(
+        other.c.user_key == table.c.user_key, other.c.status == 'running'
+    ).scalar_subquery()
+    return (user_running, table.c.created_at, table.c.id)
+
+def start_llm_request(request_id):
+    """
+    Sıra bu isteğe geldiyse ve boş yer varsa 'running' durumuna al (bkz. llm_queue_order).
+
+    Returns:
+        (başladı mı, sıradaki konumu - 1'den başlar)
+    """
+    table = LLMRequest.__table__
+    now = datetime.utcnow()
+    order = llm_queue_order(table)
+    running = select(func.count()).select_from(table).where(table.c.status == 'running').scalar_subquery()
+    next_id = select(table.c.id).where(table.c.status == 'waiting').order_by(*order).limit(1).scalar_subquery()
+    with db.engine.begin() as connection:
+        started = connection.execute(table.update().where(
+            table.c.id == request_id, table.c.id == next_id, running < LLM_MAX_IN_FLIGHT
+        ).values(status='running', started_at=now, heartbeat_at=now)).rowcount
+        if started:
+            return True, 0
+        connection.execute(table.update().where(table.c.id == request_id).values(heartbeat_at=now))
+        waiting = connection.execute(select(table.c.id).where(table.c.status == 'waiting').order_by(*order)).scalars().all()
+    if request_id not in waiting:
+        raise LLMQueueRejected('Kuyruk kaydı bulunamadı', 503)  # Sahipsiz sayılıp silindi
+    return False, waiting.index(request_id) + 1
+
+def touch_llm_request(request_id):
+    """Uzun süren (akışlı) üretimlerde heartbeat'i yenile"""
+    table = LLMRequest.__table__
+    with db.engine.begin() as connection:
+        connection.execute(table.update().where(table.c.id == request_id).values(heartbeat_at=datetime.utcnow()))
+
+def release_llm_request(request_id):
+    table = LLMRequest.__table__
+    with db.engine.begin() as connection:
+        connection.execute(table.delete().where(table.c.id == request_id))
+
+def wait_for_llm_request(request_id, timeout=None):
+    """
+    Sıra gelene kadar bekle; her bekleme adımında sıradaki konumu yield eder.
+    timeout (web isteklerinde varsayılan LLM_QUEUE_WAIT_TIMEOUT, arka planda
+    süresiz) aşılırsa LLMQueueRejected (503).
+    """
+    if timeout is None and has_request_context():
+        timeout = LLM_QUEUE_WAIT_TIMEOUT
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        started, position = start_llm_request(request_id)
+        if started:
+            return
+        if deadline is not None and time.monotonic() > deadline:
+            raise LLMQueueRejected('Yapay zekâ kuyruğunda bekleme süresi aşıldı, lütfen tekrar deneyin',
+                                   503, retry_after=LLM_QUEUE_WAIT_TIMEOUT)
+        yield position
+        time.sleep(LLM_QUEUE_POLL_INTERVAL)
+
+@contextmanager
+def llm_slot(user_key=None, timeout=None, on_wait=None):
+    """
+    LLM üretimi için kuyrukta yer al, sıra gelince çalıştır, sonunda yeri bırak:
+        with llm_slot():
+            llm.generate(...)
+    on_wait(konum) beklerken her yoklamada çağrılır (arka plan işi heartbeat'i).
+    """
+    request_id = admit_llm_request(user_key)
+    try:
+        for position in wait_for_llm_request(request_id, timeout=timeout):
+            if on_wait is not None:
+                on_wait(position)
+        yield request_id
+    finally:
+        release_llm_request(request_id)
+
+# FiberArizaAI.analyze_with_llm de aynı kuyruktan geçer
+ai.llm_slot = llm_slot
+
+def llm_queue_rejected_response(e, success_key='error'):
+    """Kuyruk reddini JSON hata yanıtına çevir (Retry-After başlığıyla)"""
+    response = jsonify({'success': False, success_key: str(e)})
+    response.status_code = e.status_code
+    if e.retry_after:
+        response.headers['Retry-After'] = str(e.retry_after)
+    return response
+
+@app.route('/api/ai/queue')
+def ai_queue_status():
+    """LLM kuyruğunun durumu ve bu kullanıcının bekleyen isteğinin sırası"""
+    table = LLMRequest.__table__
+    user_key = llm_user_key()
+    with db.engine.begin() as connection:
+        release_stale_llm_requests(connection)  # Ölmüş worker'ların kayıtları sayılmasın
+    running = db.session.execute(select(table.c.user_key).where(table.c.status == 'running')).scalars().all()
+    waiting = db.session.execute(
+        select(table.c.user_key).where(table.c.status == 'waiting').order_by(*llm_queue_order(table))
+    ).scalars().all()
+    return jsonify({
+        'in_flight': len(running),
+        'waiting': len(waiting),
+        'max_in_flight': LLM_MAX_IN_FLIGHT,
+        'max_waiting': LLM_MAX_WAITING,
+        'running': user_key in running,
+        'position': waiting.index(user_key) + 1 if user_key in waiting else None
+    })
+
+def wants_event_stream():
+    """İstemci token akışı istedi mi? (?stream=1 veya Accept: text/event-stream)"""
+    return request.args.get('stream') == '1' or 'text/event-stream' in request.headers.get('Accept', '')
+
+def sse_event(data, event=None):
+    """Tek bir Server-Sent Events mesajı"""
+    prefix = f"event: {event}\n" if event else ''
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def llm_event_stream(prompt, temperature=None, use_cache=True):
+    """
+    Modelin token'larını geldikçe Server-Sent Events olarak ilet:
+        event: queue + data: {"position": n}             LLM kuyruğunda beklerken
+        data: {"token": "..."}                           her parça için
+        event: done  + data: {"model": ..., "cached": ...}  üretim bittiğinde
+        event: error + data: {"error": ...}              model / kuyruk hatasında
+    Önbellekteki yanıt tek parça olarak hemen gönderilir; tamamlanan akışlar
+    önbelleğe yazılır. İstemci bağlantıyı koparınca WSGI sunucusu generator'ı
+    kapatır, llm.stream da Ollama bağlantısını kapatarak üretimi durdurur.
+    Kuyruğa kabul yanıt başlamadan yapılır; dolu kuyrukta LLMQueueRejected.
+    Kuyruk kaydı yanıt kapanınca da bırakılır: istemci ilk parçadan önce
+    koparsa generator hiç başlamaz ve finally bloğu çalışmaz.
+    """
+    version = get_data_version()
+    key = llm_cache_key(prompt, temperature, version)
+    cached = llm_cache_get(key) if use_cache else None
+    request_id = admit_llm_request() if cached is None else None
+
+    def generate():
+        yield ': stream\n\n'  # Başlıklar model beklenmeden gönderilir
+        if cached is not None:
+            yield sse_event({'token': cached})
+            yield sse_event({'model': llm.model, 'cached': True}, event='done')
+            return
+        parts = []
+        try:
+            for position in wait_for_llm_request(request_id):
+                yield sse_event({'position': position}, event='queue')
+            touched = time.monotonic()
+            tokens = llm.stream(prompt, temperature=temperature)
+            try:
+                for token in tokens:
+                    parts.append(token)
+                    yield sse_event({'token': token})
+                    if time.monotonic() - touched > LLM_HEARTBEAT_INTERVAL:
+                        touch_llm_request(request_id)
+                        touched = time.monotonic()
+            finally:
+                tokens.close()
+        except (LLMError, LLMQueueRejected) as e:
+            yield sse_event({'error': str(e)}, event='error')
+            return
+        finally:
+            release_llm_request(request_id)
+        if parts:
+            llm_cache_put(key, version, ''.join(parts))
+        yield sse_event({'model': llm.model, 'cached': False}, event='done')
+
+    def release_on_close():
+        # İstek context'i yanıt gövdesi gönderilmeden kapanmış olur
+        with app.app_context():
+            release_llm_request(request_id)
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # nginx tamponlamasın
+    })
+    if request_id is not None:
+        response.call_on_close(release_on_close)
+    return response
+
 @app.route('/api/ai/analyze', methods=['POST'])
 def ai_analyze():
-    """AI ile arıza analizi"""
+    """AI ile arıza analizi (?stream=1 veya Accept: text/event-stream ile token akışı)"""
     data = request.get_json()
     prompt = data.get('prompt', '')
     
     # Veritabanı context'i ekle
-    total_records = FiberAriza.query.count()
-    hags_count = FiberAriza.query.filter_by(hags_asildi_mi='Evet').count()
-    solved_count = FiberAriza.query.filter_by(kalici_cozum='Evet').count()
+    stats = get_fault_stats()
+    total_records = stats['total']
+    hags_count = stats['hags_exceeded']
+    solved_count = stats['solved']
     
     context = f"""
     Fiber optik arıza takip sistemi verileri:
@@ -1093,30 +3237,18 @@ def ai_analyze():
     """
     
     try:
-        response = requests.post(
-            f"{OLLAMA_URL}/api/generate",
-            json={
-                "model": AI_MODEL,
-                "prompt": context,
-                "stream": False
-            },
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            ai_response = response.json().get("response", "")
-            return jsonify({
-                "success": True,
-                "response": ai_response,
-                "model": AI_MODEL
-            })
-        else:
-            return jsonify({
-                "success": False,
-                "error": f"Model hatası: {response.status_code}"
-            }), 500
-            
-    except Exception as e:
+        if wants_event_stream():
+            return llm_event_stream(context, use_cache=not llm_cache_bypassed())
+        ai_response, cached = cached_llm_generate(context, use_cache=not llm_cache_bypassed())
+        return jsonify({
+            "success": True,
+            "response": ai_response,
+            "model": llm.model,
+            "cached": cached
+        })
+    except LLMQueueRejected as e:
+        return llm_queue_rejected_response(e)
+    except LLMError as e:
         return jsonify({
             "success": False,
             "error": str(e)
@@ -1126,14 +3258,11 @@ def ai_analyze():
 def ai_insights():
     """Dashboard için AI içgörüleri"""
     # Veritabanı istatistikleri
-    total = FiberAriza.query.count()
+    stats = get_fault_stats()
+    total = stats['total']
     
     # Bölgesel analiz
-    from sqlalchemy import func
-    bolge_stats = db.session.query(
-        FiberAriza.bolge,
-        func.count(FiberAriza.id).label('count')
-    ).group_by(FiberAriza.bolge).all()
+    bolge_stats = [(region['bolge'], region['total']) for region in stats['by_region']]
     
     # En riskli bölgeler
     risk_areas = []
@@ -1155,7 +3284,7 @@ def ai_insights():
         })
     
     # HAGS analizi
-    hags_count = FiberAriza.query.filter_by(hags_asildi_mi='Evet').count()
+    hags_count = stats['hags_exceeded']
     if total > 0 and (hags_count / total) > 0.2:
         predictions.append({
             "type": "hags_alert",
@@ -1170,9 +3299,25 @@ def ai_insights():
         "generated_at": datetime.now().isoformat()
     })
 
+@app.route('/api/ai/metrics')
+def ai_metrics():
+    """LLM istemcisinin çağrı, hata, token, gecikme ve önbellek sayaçları (bu worker süreci için)"""
+    table = LLMResponseCache.__table__
+    entries, total_hits = db.session.execute(select(func.count(), func.coalesce(func.sum(table.c.hits), 0))).one()
+    return jsonify({
+        'model': llm.model,
+        'pid': os.getpid(),
+        **llm.metrics.snapshot(),
+        'cache': {
+            **_llm_cache_stats,
+            'entries': entries,
+            'total_hits': total_hits  # Tüm worker'lardaki kayıtlı isabetler
+        }
+    })
+
 @app.route('/api/ai/chat', methods=['POST'])
 def ai_chat():
-    """RAG destekli AI chat"""
+    """RAG destekli AI chat (?stream=1 veya Accept: text/event-stream ile token akışı)"""
     data = request.get_json()
     message = data.get('message', '')
     
@@ -1187,16 +3332,13 @@ def ai_chat():
         context = ""
     
     # Veritabanı istatistikleri
-    total_ariza = FiberAriza.query.count()
-    hags_asan = FiberAriza.query.filter_by(hags_asildi_mi='Evet').count()
-    cozulen = FiberAriza.query.filter_by(kalici_cozum='Evet').count()
+    stats = get_fault_stats()
+    total_ariza = stats['total']
+    hags_asan = stats['hags_exceeded']
+    cozulen = stats['solved']
     
     # Bölge istatistikleri ekle
-    from sqlalchemy import func
-    bolge_stats = db.session.query(
-        FiberAriza.bolge,
-        func.count(FiberAriza.id).label('count')
-    ).group_by(FiberAriza.bolge).all()
+    bolge_stats = [(region['bolge'], region['total']) for region in stats['by_region']]
     
     bolge_info = "\nBölgesel Dağılım:\n"
     for bolge, count in bolge_stats[:5]:  # İlk 5 bölge
@@ -1231,68 +3373,115 @@ def ai_chat():
     4. Türkçe olarak net ve anlaşılır cevap ver
     """
     
+    use_cache = not llm_cache_bypassed()
     try:
-        response = requests.post(
-            f"{OLLAMA_URL}/api/generate",
-            json={
-                "model": AI_MODEL,
-                "prompt": full_prompt,
-                "stream": False,
-                "temperature": 0.2  # Daha deterministik cevaplar
-            },
-            timeout=60
-        )
-        
-        if response.status_code == 200:
-            ai_response = response.json().get("response", "")
-            return jsonify({
-                "success": True,
-                "message": ai_response
-            })
-        else:
-            return jsonify({
-                "success": False,
-                "message": f"Model hatası: {response.status_code}"
-            }), 500
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
+        if wants_event_stream():
+            return llm_event_stream(full_prompt, temperature=0.2, use_cache=use_cache)  # Daha deterministik cevaplar
+        ai_response, cached = cached_llm_generate(full_prompt, temperature=0.2, use_cache=use_cache)
+        return jsonify({
+            "success": True,
+            "message": ai_response,
+            "cached": cached
+        })
+    except LLMQueueRejected as e:
+        return llm_queue_rejected_response(e, success_key='message')
+    except LLMError as e:
         return jsonify({
             "success": False,
             "message": f"Hata: {str(e)}"
         }), 500
 
-@app.route('/api/ai/report/<string:report_type>')
-def ai_generate_report(report_type):
-    """AI ile otomatik rapor üretimi"""
-    
-    if report_type == 'weekly':
-        # Haftalık rapor
-        prompt = """
+# Rapor tipleri -> rapor talimatı
+AI_REPORT_PROMPTS = {
+    # Haftalık rapor
+    'weekly': """
         Haftalık fiber arıza raporu hazırla. Şunları içersin:
         1. Genel durum özeti
         2. En çok arıza olan bölgeler
         3. HAGS performansı
         4. Öneriler
-        """
-    elif report_type == 'risk':
-        # Risk analizi raporu
-        prompt = """
+        """,
+    # Risk analizi raporu
+    'risk': """
         Risk analizi raporu hazırla:
         1. Yüksek riskli bölgeler
         2. Tekrarlayan arıza nedenleri
         3. Önleyici tedbirler
         4. Yatırım önerileri
-        """
-    else:
-        return jsonify({"error": "Geçersiz rapor tipi"}), 400
+        """,
+}
+
+class AIReport(db.Model):
+    """Üretilmiş AI raporlarının dizini (dosyalar files/ altında); tip başına son AI_REPORT_KEEP tanesi tutulur"""
+    id = db.Column(db.Integer, primary_key=True)
+    report_type = db.Column(db.String(20), nullable=False)
+    filename = db.Column(db.String(200), nullable=False)
+    data_version = db.Column(db.Integer, nullable=False)  # Raporun üretildiği arıza veri versiyonu
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_ai_report_type_created_at', 'report_type', 'created_at'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'report_type': self.report_type,
+            'filename': self.filename,
+            'data_version': self.data_version,
+            'generated_at': self.created_at.isoformat() if self.created_at else None,
+            'download_url': url_for('api_ai_report_download', report_id=self.id)
+        }
+
+# Raporların önceden üretimi: arıza verisi AI_REPORT_DEBOUNCE saniye boyunca
+# değişmeden kalınca eskiyen rapor tipleri için arka plan işi kuyruğa alınır.
+# Her worker kendi zamanlayıcı iş parçacığını çalıştırır; iş id'si (tip, versiyon)
+# üzerinden belirlendiği için aynı rapor birden fazla kez kuyruğa girmez.
+# Sabit saatli üretim için `flask generate-ai-reports` cron'a eklenebilir.
+AI_REPORT_KEEP = 10
+AI_REPORT_AUTO_REFRESH = True
+AI_REPORT_DEBOUNCE = 600
+AI_REPORT_CHECK_INTERVAL = 60
+_ai_report_scheduler = {'version': None, 'seen_at': None, 'thread': None}
+_ai_report_scheduler_lock = threading.Lock()
+
+def latest_ai_report(report_type):
+    return AIReport.query.filter_by(report_type=report_type).order_by(
+        AIReport.created_at.desc(), AIReport.id.desc()
+    ).first()
+
+def index_ai_report(report_type, filename, data_version):
+    """Raporu dizine ekle; tip başına AI_REPORT_KEEP'ten eski kayıtları dosyalarıyla sil"""
+    entry = AIReport(report_type=report_type, filename=filename, data_version=data_version)
+    db.session.add(entry)
+    db.session.commit()
+    old_entries = AIReport.query.filter_by(report_type=report_type).order_by(
+        AIReport.created_at.desc(), AIReport.id.desc()
+    ).offset(AI_REPORT_KEEP).all()
+    for old in old_entries:
+        try:
+            os.remove(os.path.join(BASE_DIR, old.filename))
+        except FileNotFoundError:
+            pass
+        db.session.delete(old)
+    db.session.commit()
+    return entry
+
+def generate_ai_report(report_type, use_cache=True, user_key=None, heartbeat=None):
+    """
+    Raporu modelle üret, files/ altına kaydet ve rapor dizinine ekle.
+    use_cache=False model yanıt önbelleğini atlar (elle yeniden üretim).
+    user_key verilirse üretim o kullanıcının LLM kotasından düşer ve sırada en
+    fazla LLM_JOB_WAIT_TIMEOUT beklenir; heartbeat için bkz. cached_llm_generate.
+    Returns: {'success', 'report', 'filename', 'cached', 'id', 'report_type',
+    'data_version', 'generated_at'};
+    model hatasında LLMError (RuntimeError)
+    """
+    prompt = AI_REPORT_PROMPTS[report_type]
+    version = get_data_version()
     
     # Veritabanından veri topla
-    stats = {
-        "total": FiberAriza.query.count(),
-        "solved": FiberAriza.query.filter_by(kalici_cozum='Evet').count(),
-        "hags_exceeded": FiberAriza.query.filter_by(hags_asildi_mi='Evet').count()
-    }
+    stats = get_fault_stats()
     
     full_prompt = f"""
     {prompt}
@@ -1301,57 +3490,204 @@ def ai_generate_report(report_type):
     - Toplam arıza: {stats['total']}
     - Çözülen: {stats['solved']}
     - HAGS aşan: {stats['hags_exceeded']}
+    - Bölgeler: {', '.join(f"{r['bolge']} ({r['total']})" for r in stats['by_region'])}
+    - En sık kök nedenler: {', '.join(f"{c['kok_neden']} ({c['total']})" for c in stats['top_root_causes'])}
     
     Profesyonel bir rapor formatında yaz.
     """
     
-    try:
-        response = requests.post(
-            f"{OLLAMA_URL}/api/generate",
-            json={
-                "model": AI_MODEL,
-                "prompt": full_prompt,
-                "stream": False,
-                "temperature": 0.3  # Daha tutarlı çıktı için
-            },
-            timeout=60  # Rapor için daha uzun timeout
-        )
-        
-        if response.status_code == 200:
-            report = response.json().get("response", "")
-            
-            # Raporu kaydet
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"ai_report_{report_type}_{timestamp}.txt"
-            filepath = os.path.join("files", filename)
-            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(report)
-            
+    report, cached = cached_llm_generate(
+        full_prompt, temperature=0.3,  # Daha tutarlı çıktı için
+        use_cache=use_cache, user_key=user_key,
+        timeout=LLM_JOB_WAIT_TIMEOUT if user_key else None, heartbeat=heartbeat
+    )
+    
+    # Raporu kaydet (zamanlayıcı ve elle üretim aynı saniyeye denk gelebilir)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    filename = f"ai_report_{report_type}_{timestamp}.txt"
+    filepath = os.path.join(BASE_DIR, filename)
+    
+    with open(filepath, 'w', encoding='utf-8') as f:
+        f.write(report)
+    entry = index_ai_report(report_type, filename, version)
+    
+    return {
+        "success": True,
+        "report": report,
+        "filename": filename,
+        "cached": cached,
+        "id": entry.id,
+        "report_type": report_type,
+        "data_version": version,
+        "generated_at": entry.created_at.isoformat()
+    }
+
+def schedule_ai_reports():
+    """
+    Veri versiyonu AI_REPORT_DEBOUNCE boyunca değişmediyse, en yeni raporu
+    eski versiyona ait rapor tipleri için üretim işi kuyruğa al.
+
+    Returns:
+        Kuyruğa alınan iş id'leri
+    """
+    version = get_data_version()
+    now = time.monotonic()
+    state = _ai_report_scheduler
+    if version != state['version']:
+        state['version'], state['seen_at'] = version, now
+        return []
+    if now - state['seen_at'] < AI_REPORT_DEBOUNCE:
+        return []
+
+    submitted = []
+    for report_type in AI_REPORT_PROMPTS:
+        latest = latest_ai_report(report_type)
+        if latest is not None and latest.data_version >= version:
+            continue
+        job_id = hashlib.md5(f"ai_report:{report_type}:{version}".encode('utf-8')).hexdigest()
+        if db.session.get(BackgroundJob, job_id) is not None:
+            continue  # Bu versiyon için kuyruğa alınmış (başarısız olduysa sonraki değişikliği bekler)
+        try:
+            submit_job('ai_report', {'report_type': report_type, 'scheduled': True}, job_id=job_id)
+        except IntegrityError:
+            db.session.rollback()  # Başka bir worker aynı anda kuyruğa aldı
+            continue
+        submitted.append(job_id)
+    return submitted
+
+def run_ai_report_scheduler():
+    """Zamanlayıcı iş parçacığı: AI_REPORT_CHECK_INTERVAL aralıklarla schedule_ai_reports"""
+    while True:
+        time.sleep(AI_REPORT_CHECK_INTERVAL)
+        try:
+            with app.app_context():
+                schedule_ai_reports()
+        except Exception:
+            app.logger.exception("AI rapor zamanlayıcısı hatası")
+
+@app.before_request
+def start_ai_report_scheduler():
+    """Zamanlayıcıyı istek karşılayan süreçlerde ilk istekle başlat (CLI komutlarında çalışmaz)"""
+    if not AI_REPORT_AUTO_REFRESH or _ai_report_scheduler['thread'] is not None:
+        return
+    with _ai_report_scheduler_lock:
+        if _ai_report_scheduler['thread'] is None:
+            thread = threading.Thread(target=run_ai_report_scheduler, name='ai-report-scheduler', daemon=True)
+            thread.start()
+            _ai_report_scheduler['thread'] = thread
+
+@app.cli.command('generate-ai-reports')
+@click.option('--type', 'report_types', multiple=True, type=click.Choice(list(AI_REPORT_PROMPTS)),
+              help='Üretilecek rapor tipi (varsayılan: hepsi)')
+@click.option('--fresh', is_flag=True, help='Model yanıt önbelleğini atla')
+def generate_ai_reports_command(report_types, fresh):
+    """AI raporlarını şimdi üret (cron ile zamanlanabilir)"""
+    for report_type in report_types or AI_REPORT_PROMPTS:
+        result = generate_ai_report(report_type, use_cache=not fresh)
+        print(f"✅ {report_type} raporu üretildi: {result['filename']} (veri versiyonu {result['data_version']})")
+
+def submit_ai_report_job(report_type, use_cache=True):
+    """
+    Aynı tip için kuyrukta bekleyen veya çalışan rapor işi varsa onu döndür;
+    yoksa üretimi isteği yapanın LLM kotasından düşen yeni iş kuyruğa al.
+    """
+    job = BackgroundJob.query.filter(
+        BackgroundJob.kind == 'ai_report',
+        BackgroundJob.status.in_(('queued', 'running')),
+        BackgroundJob.params['report_type'].as_string() == report_type
+    ).order_by(BackgroundJob.created_at).first()
+    if job is not None:
+        return job
+    return submit_job('ai_report', {'report_type': report_type, 'use_cache': use_cache, 'user_key': llm_user_key()})
+
+@job_handler('ai_report')
+def ai_report_job(job_id, params, progress):
+    last = {'message': None, 'at': 0.0}
+
+    def heartbeat(message):
+        # Kuyrukta beklerken her yoklamada çağrılır; iş kaydı seyrek güncellenir
+        now = time.monotonic()
+        if message != last['message'] or now - last['at'] >= LLM_HEARTBEAT_INTERVAL:
+            progress(0, message=message)
+            last.update(message=message, at=now)
+
+    result = generate_ai_report(
+        params['report_type'], use_cache=params.get('use_cache', True),
+        user_key=params.get('user_key'), heartbeat=heartbeat
+    )
+    return {
+        'result': result,
+        'result_path': os.path.join(BASE_DIR, result['filename']),
+        'result_name': result['filename'],
+        'result_mimetype': 'text/plain'
+    }
+
+@app.route('/api/ai/report/<string:report_type>')
+def ai_generate_report(report_type):
+    """
+    AI raporu. Önceden üretilmiş en yeni rapor varsa hemen döner ('stale':
+    veriler rapordan sonra değişti mi); yoksa üretilir (?async=1 ile arka plan
+    işi). ?regenerate=1 önbelleği atlayarak yeni üretim işi başlatır. Aynı tip
+    için süren bir iş varsa yenisi açılmaz, onun durum adresi döner.
+    """
+    if report_type not in AI_REPORT_PROMPTS:
+        return jsonify({"error": "Geçersiz rapor tipi"}), 400
+    
+    if request.args.get('regenerate') == '1':
+        return job_accepted(submit_ai_report_job(report_type, use_cache=False))
+    
+    latest = latest_ai_report(report_type)
+    if latest is not None:
+        try:
+            with open(os.path.join(BASE_DIR, latest.filename), encoding='utf-8') as f:
+                report = f.read()
+        except FileNotFoundError:
+            pass  # Dosya elle silinmiş; yeniden üretilir
+        else:
             return jsonify({
                 "success": True,
                 "report": report,
-                "filename": filename
+                "stale": latest.data_version != get_data_version(),
+                **latest.to_dict()
             })
+    
+    if wants_async():
+        return job_accepted(submit_ai_report_job(report_type))
+    
+    try:
+        return jsonify(generate_ai_report(report_type))
+    except LLMQueueRejected as e:
+        return llm_queue_rejected_response(e)
     except Exception as e:
         return jsonify({
             "success": False,
             "error": str(e)
         }), 500
 
+@app.route('/api/ai/reports')
+def api_ai_reports():
+    """Dizindeki son raporlar (?type=weekly|risk ile filtrelenebilir)"""
+    query = AIReport.query
+    if request.args.get('type'):
+        query = query.filter_by(report_type=request.args['type'])
+    reports = query.order_by(AIReport.created_at.desc(), AIReport.id.desc()).limit(AI_REPORT_KEEP * len(AI_REPORT_PROMPTS))
+    return jsonify([report.to_dict() for report in reports])
+
+@app.route('/api/ai/reports/<int:report_id>/download')
+def api_ai_report_download(report_id):
+    """Dizindeki raporu indir"""
+    report = AIReport.query.get_or_404(report_id)
+    path = os.path.join(BASE_DIR, report.filename)
+    if not os.path.exists(path):
+        return jsonify({'error': 'Rapor dosyası bulunamadı'}), 404
+    return send_file(path, mimetype='text/plain', as_attachment=True, download_name=report.filename)
+
 # Dashboard'a AI widget eklemek için
 @app.route('/api/ai/widget')
 def ai_widget_data():
     """Dashboard AI widget verisi"""
-    # Basit tahminler
-    total = FiberAriza.query.count()
-    
     # Son 7 günün arıza ortalaması
-    from datetime import datetime, timedelta
-    seven_days_ago = datetime.now() - timedelta(days=7)
-    recent_count = FiberAriza.query.filter(
-        FiberAriza.ariza_baslangic >= seven_days_ago
-    ).count()
+    recent_count = get_fault_stats()['last_7_days']
     
     daily_avg = recent_count / 7 if recent_count > 0 else 0
     
@@ -1428,6 +3764,28 @@ def api_get_playground_data(module_name):
     
     query = PlaygroundData.query.filter_by(module_id=module.id)
     
+    # Cursor pagination: ?limit=50&cursor=<next_cursor> (id üzerinde artan sırada)
+    limit = request.args.get('limit', type=int)
+    if limit is not None:
+        limit = min(max(limit, 1), MAX_PAGE_SIZE)
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                (last_id,) = decode_cursor(cursor)
+            except (ValueError, TypeError):
+                return jsonify({'error': 'Geçersiz cursor'}), 400
+            query = query.filter(PlaygroundData.id > last_id)
+        rows = query.order_by(PlaygroundData.id).limit(limit + 1).all()
+        next_cursor = encode_cursor([rows[limit - 1].id]) if len(rows) > limit else None
+        result = {
+            'data': [{'id': d.id, **d.data, 'created_at': d.created_at.isoformat()}
+                     for d in rows[:limit]],
+            'next_cursor': next_cursor
+        }
+        if request.args.get('include_total') == '1':
+            result['approx_total'] = playground_data_count(module.id)
+        return jsonify(result)
+    
     if page and per_page:
         pagination = query.paginate(page=page, per_page=per_page, error_out=False)
         return jsonify({
@@ -1542,10 +3900,8 @@ def api_delete_playground_data(module_name, data_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 400
 
-@app.route('/api/playground/<module_name>/export')
-def api_export_playground_data(module_name):
-    """Modül verilerini Excel olarak export et"""
-    module = PlaygroundModule.query.filter_by(name=module_name).first_or_404()
+def write_playground_export(module, output):
+    """Modül verilerini Excel olarak output'a yaz"""
     records = PlaygroundData.query.filter_by(module_id=module.id).all()
     
     # Sütun başlıklarını hazırla
@@ -1575,7 +3931,6 @@ def api_export_playground_data(module_name):
     df = pd.DataFrame(data_list, columns=columns)
     
     # Excel oluştur
-    output = BytesIO()
     with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
         df.to_excel(writer, sheet_name=module.display_name[:31], index=False)  # Excel sheet adı max 31 karakter
         worksheet = writer.sheets[module.display_name[:31]]
@@ -1584,14 +3939,20 @@ def api_export_playground_data(module_name):
         for i, col in enumerate(df.columns):
             column_width = max(df[col].astype(str).map(len).max(), len(col)) + 2
             worksheet.set_column(i, i, column_width)
-    
-    output.seek(0)
-    
-    return send_file(
-        output,
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        as_attachment=True,
-        download_name=f'{module.name}_{datetime.now().strftime("%Y%m%d_%H%M")}.xlsx'
+
+@app.route('/api/playground/<module_name>/export')
+def api_export_playground_data(module_name):
+    """Modül verilerini Excel olarak export et (modül verisi değişmedikçe önbellekten)"""
+    module = PlaygroundModule.query.filter_by(name=module_name).first_or_404()
+    key, path = cached_export(
+        'playground', {'module_id': module.id, 'module': module.name},
+        lambda output: write_playground_export(module, output),
+        '.xlsx',
+        version_name=playground_version_name(module.id)
+    )
+    return send_cached_export(
+        key, path, XLSX_MIMETYPE,
+        f'{module.name}_{datetime.now().strftime("%Y%m%d_%H%M")}.xlsx'
     )
 
 @app.route('/api/playground/modules/<int:module_id>', methods=['PUT'])
@@ -1640,19 +4001,21 @@ def api_delete_playground_module(module_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 400
 
-@app.route('/api/playground/<module_name>/import', methods=['POST'])
-def api_import_playground_data(module_name):
-    """Toplu veri import et"""
-    module = PlaygroundModule.query.filter_by(name=module_name).first_or_404()
-    data_list = request.get_json()
-    
-    if not isinstance(data_list, list):
-        return jsonify({'error': 'Veri listesi bekleniyor'}), 400
-    
+def import_playground_records(module, data_list, progress=None, commit_every=None):
+    """
+    Playground kayıtlarını içe aktar ve commit et.
+    commit_every verilirse her o kadar satırda bir commit edilip progress çağrılır
+    (arka plan işi); verilmezse tümü tek transaction'da yazılır.
+    Returns: (başarılı kayıt sayısı, hata mesajları)
+    """
     success_count = 0
     errors = []
     
     for idx, data in enumerate(data_list):
+        if commit_every and idx and idx % commit_every == 0:
+            db.session.commit()
+            if progress:
+                progress(idx, len(data_list), f'{idx} satır işlendi')
         try:
             # Manuel ID kontrolü
             if 'id' in data and data['id']:
@@ -1683,8 +4046,40 @@ def api_import_playground_data(module_name):
         except Exception as e:
             errors.append(f"Satır {idx + 1}: {str(e)}")
     
+    db.session.commit()
+    return success_count, errors
+
+@job_handler('playground_import')
+def playground_import_job(job_id, params, progress):
+    module = PlaygroundModule.query.get(params['module_id'])
+    if module is None:
+        raise ValueError('Modül bulunamadı')
+    with open(params['path'], encoding='utf-8') as f:
+        data_list = json.load(f)
+    success_count, errors = import_playground_records(module, data_list, progress, commit_every=STREAM_BATCH_SIZE)
+    return {
+        'result': {'success': success_count, 'errors': errors},
+        'message': f'{success_count} kayıt içe aktarıldı'
+    }
+
+@app.route('/api/playground/<module_name>/import', methods=['POST'])
+def api_import_playground_data(module_name):
+    """Toplu veri import et (?async=1 ile arka plan işi)"""
+    module = PlaygroundModule.query.filter_by(name=module_name).first_or_404()
+    data_list = request.get_json()
+    
+    if not isinstance(data_list, list):
+        return jsonify({'error': 'Veri listesi bekleniyor'}), 400
+    
+    if wants_async():
+        job_id = uuid.uuid4().hex
+        path = os.path.join(job_dir(job_id), 'import.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data_list, f, ensure_ascii=False)
+        return job_accepted(submit_job('playground_import', {'module_id': module.id, 'path': path}, job_id=job_id))
+    
     try:
-        db.session.commit()
+        success_count, errors = import_playground_records(module, data_list)
         return jsonify({
             'success': success_count,
             'errors': errors
@@ -1735,7 +4130,7 @@ def admin_panel():
         'total_users': User.query.count(),
         'active_users': User.query.filter_by(active=True).count(),
         'total_regions': Region.query.count(),
-        'total_faults': FiberAriza.query.count(),
+        'total_faults': get_fault_stats()['total'],
         'admin_users': User.query.filter(User.role.in_(['admin', 'super_admin'])).count()
     }
     
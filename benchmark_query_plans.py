@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+KAREL Network Dashboard - Sorgu Planı Regresyon Testi
+Büyük sentetik bir fiber_ariza tablosu oluşturur, endpoint sorgularını
+EXPLAIN QUERY PLAN ile çalıştırır ve herhangi biri tam tablo taramasına
+(full scan) düşerse hata koduyla çıkar.
+
+Kullanım:
+    python benchmark_query_plans.py --rows 200000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, select, tuple_, insert, func
+
+from app import (
+    db, FiberAriza, PlaygroundData, PlaygroundModule, create_spatial_index,
+    ariza_filter_criteria, map_data_criteria, map_cluster_stmt, kmz_export_criteria
+)
+
+BOLGELER = ['Bursa', 'Kocaeli', 'Sakarya', 'Balıkesir', 'Çanakkale', 'Bilecik', 'Düzce']
+ILLER = ['BURSA', 'KOCAELI', 'SAKARYA', 'BALIKESIR', 'CANAKKALE', 'BILECIK', 'DUZCE', 'YALOVA']
+KOK_NEDENLER = ['Doğalgaz Firması Çalışması', 'TC Karayolları Çalışması', 'Kablo kopması', 'Hafriyat']
+
+
+def endpoint_queries():
+    """
+    Endpoint'lerin çalıştırdığı sorgular: (isim, select) listesi.
+    Filtre koşulları ve kümeleme sorgusu app'teki builder'larla kurulur.
+    Tüm tabloyu döndüren dökümler (api_arizalar tam liste, export_excel_all,
+    export_kmz/all, filtresiz api_map_data) tanım gereği tarama yapar ve burada
+    yer almaz; compute_fault_stats yalnızca küçük rollup tablosunu tarar.
+    """
+    now = datetime(2025, 6, 1)
+    # api_map_data ?bbox= / api_nearby_arizalar: adaylar R*Tree'den
+    bbox = map_data_criteria(bbox=(29.0, 40.1, 29.2, 40.3), use_rtree=True)
+    # 180. meridyeni kesen bbox: iki boylam aralığı, iki R*Tree aramasının birleşimi
+    antimeridian_bbox = map_data_criteria(bbox=(170.0, 40.1, -170.0, 40.3), use_rtree=True)
+    return [
+        ('api_arizalar (cursor)', select(FiberAriza).where(
+            FiberAriza.ariza_baslangic.isnot(None),
+            tuple_(FiberAriza.ariza_baslangic, FiberAriza.id) < tuple_(now, 1000)
+        ).order_by(FiberAriza.ariza_baslangic.desc(), FiberAriza.id.desc()).limit(51)),
+        ('api_arizalar_changes', select(FiberAriza).where(FiberAriza.row_version > 1000)),
+        ('api_arizalar_filtered (bolge)', select(FiberAriza).where(*ariza_filter_criteria(bolge='Bursa'))),
+        ('api_arizalar_filtered (kalici_cozum)', select(FiberAriza).where(
+            *ariza_filter_criteria(kalici_cozum='Evet'))),
+        ('api_arizalar_filtered (bolge+kalici_cozum)', select(FiberAriza).where(
+            *ariza_filter_criteria('Bursa', 'Evet'))),
+        ('api_map_data (bolge)', select(FiberAriza).where(*map_data_criteria(bolge='Bursa'))),
+        ('api_map_data (kalici_cozum)', select(FiberAriza).where(*map_data_criteria(kalici_cozum='Evet'))),
+        ('api_map_data (bbox)', select(FiberAriza).where(*bbox)),
+        ('api_map_data (bbox, 180. meridyen)', select(FiberAriza).where(*antimeridian_bbox)),
+        ('api_map_data (bbox kümeleme)', map_cluster_stmt(bbox, zoom=10)),
+        ('api_filter_data (bolge)', select(FiberAriza.bolge).distinct().order_by(FiberAriza.bolge)),
+        ('api_filter_data (il)', select(FiberAriza.il).distinct().order_by(FiberAriza.il)),
+        ('compute_fault_stats (son 7 gün)', select(func.count(FiberAriza.id)).where(
+            FiberAriza.ariza_baslangic >= now - timedelta(days=7))),
+        ('dashboard (son 10)', select(FiberAriza).order_by(FiberAriza.ariza_baslangic.desc()).limit(10)),
+        ('export_kmz (solved)', select(FiberAriza).where(*kmz_export_criteria('solved'))),
+        ('export_kmz (unsolved)', select(FiberAriza).where(*kmz_export_criteria('unsolved'))),
+        ('api_get_playground_data (cursor)', select(PlaygroundData).where(
+            PlaygroundData.module_id == 1, PlaygroundData.id > 1000
+        ).order_by(PlaygroundData.id).limit(51)),
+    ]
+
+
+def seed(engine, rows, batch_size=10000):
+    """Sentetik arıza kayıtları oluştur"""
+    random.seed(42)
+    start = datetime(2022, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(PlaygroundModule), [{'id': 1, 'name': 'bench', 'display_name': 'Bench'}])
+        for offset in range(0, rows, batch_size):
+            batch = []
+            for i in range(offset, min(offset + batch_size, rows)):
+                has_coords = random.random() < 0.6
+                lat = round(random.uniform(39.5, 41.2), 5) if has_coords else None
+                lon = round(random.uniform(26.0, 31.5), 5) if has_coords else None
+                baslangic = start + timedelta(minutes=random.randint(0, 3 * 365 * 24 * 60))
+                batch.append({
+                    'id': i + 1,
+                    'hafta': f'W{baslangic.isocalendar()[1]:02d}',
+                    'bolge': random.choice(BOLGELER),
+                    'bulten_no': str(10000000000 + i),
+                    'il': random.choice(ILLER),
+                    'ariza_baslangic': baslangic,
+                    'ariza_bitis': baslangic + timedelta(minutes=random.randint(30, 900)),
+                    'ariza_kok_neden': random.choice(KOK_NEDENLER),
+                    'hags_asildi_mi': random.choice(['Evet', 'Hayır']),
+                    'kalici_cozum': random.choice(['Evet', 'Hayır', '', None]),
+                    'kordinat_a': str(lat).replace('.', ',') if lat else '',
+                    'kordinat_b': str(lon).replace('.', ',') if lon else '',
+                    'lat': lat,
+                    'lon': lon,
+                    'row_version': i + 1,
+                    'yil': str(baslangic.year),
+                })
+            conn.execute(insert(FiberAriza), batch)
+            conn.execute(insert(PlaygroundData), [
+                {'id': row['id'], 'module_id': 1, 'data': {}} for row in batch
+            ])
+
+
+def explain(conn, stmt):
+    """Sorgu planı satırlarını döndür"""
+    compiled = stmt.compile(dialect=conn.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    rows = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}', params).fetchall()
+    return [row[3] for row in rows]
+
+
+def is_full_scan(plan_line):
+    """İndeks kullanmayan tablo taraması mı?"""
+    return plan_line.startswith('SCAN ') and 'INDEX' not in plan_line
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Endpoint sorgu planı regresyon testi')
+    parser.add_argument('--rows', type=int, default=200000, help='Sentetik kayıt sayısı')
+    parser.add_argument('--analyze', action='store_true', help='Planlamadan önce ANALYZE çalıştır')
+    args = parser.parse_args()
+
+    print("🔍 KAREL Network Dashboard - Sorgu Planı Testi")
+    print("-" * 50)
+
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    engine = create_engine(f'sqlite:///{db_path}')
+    try:
+        db.metadata.create_all(engine)
+        with engine.begin() as conn:
+            create_spatial_index(conn)
+
+        started = time.perf_counter()
+        seed(engine, args.rows)
+        print(f"📦 {args.rows} sentetik kayıt oluşturuldu ({time.perf_counter() - started:.1f} sn)")
+
+        failures = []
+        with engine.connect() as conn:
+            if args.analyze:
+                conn.exec_driver_sql('ANALYZE')
+            for name, stmt in endpoint_queries():
+                plan = explain(conn, stmt)
+                started = time.perf_counter()
+                conn.execute(stmt).fetchall()
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                full_scan = any(is_full_scan(line) for line in plan)
+                status = '❌' if full_scan else '✅'
+                print(f"{status} {name:<45} {elapsed_ms:8.1f} ms  | {' / '.join(plan)}")
+                if full_scan:
+                    failures.append(name)
+    finally:
+        engine.dispose()
+        os.remove(db_path)
+
+    if failures:
+        print(f"\n❌ {len(failures)} sorgu tam tablo taramasına düştü: {', '.join(failures)}")
+        return 1
+    print("\n✅ Tüm sorgular indeks kullanıyor")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,6 +11,7 @@ import numpy as np
 from datetime import datetime
 import os
 from typing import Dict, List, Any
+from field_parsers import parse_datetime_series
 
 class FiberArizaAnalyzer:
     def __init__(self, db_path: str = 'instance/fiberariza.db'):
@@ -102,8 +103,8 @@ class FiberArizaAnalyzer:
         
         # Arıza süreleri analizi
         if 'ariza_baslangic' in df.columns and 'ariza_bitis' in df.columns:
-            df['ariza_baslangic'] = pd.to_datetime(df['ariza_baslangic'], errors='coerce')
-            df['ariza_bitis'] = pd.to_datetime(df['ariza_bitis'], errors='coerce')
+            df['ariza_baslangic'] = parse_datetime_series(df['ariza_baslangic'])
+            df['ariza_bitis'] = parse_datetime_series(df['ariza_bitis'])
             
             valid_dates = df[(df['ariza_baslangic'].notna()) & (df['ariza_bitis'].notna())]
             if len(valid_dates) > 0:
@@ -159,8 +160,12 @@ class FiberArizaAnalyzer:
             if 'kalici_cozum' in df.columns:
                 features['is_solved'] = (df['kalici_cozum'] == 'Evet').astype(int)
             
-            # Koordinat features
-            if 'kordinat_a' in df.columns and 'kordinat_b' in df.columns:
+            # Koordinat features - tipli lat/lon sütunları varsa doğrudan kullanılır
+            if 'lat' in df.columns and 'lon' in df.columns:
+                features['has_coordinates'] = ((df['lat'].notna()) & (df['lon'].notna())).astype(int)
+                features['latitude'] = df['lat'].fillna(0)
+                features['longitude'] = df['lon'].fillna(0)
+            elif 'kordinat_a' in df.columns and 'kordinat_b' in df.columns:
                 features['has_coordinates'] = ((df['kordinat_a'].notna()) & (df['kordinat_b'].notna())).astype(int)
                 
                 # Koordinatları float'a çevir
@@ -172,7 +177,7 @@ class FiberArizaAnalyzer:
             
             # Zaman features
             if 'ariza_baslangic' in df.columns:
-                df['ariza_baslangic'] = pd.to_datetime(df['ariza_baslangic'], errors='coerce')
+                df['ariza_baslangic'] = parse_datetime_series(df['ariza_baslangic'])
                 features['start_hour'] = df['ariza_baslangic'].dt.hour
                 features['start_day_of_week'] = df['ariza_baslangic'].dt.dayofweek
                 features['start_month'] = df['ariza_baslangic'].dt.month
@@ -0,0 +1,98 @@
+"""
+KAREL Network Dashboard - Export Önbelleği
+Üretilmiş export dosyalarını (Excel, KMZ ...) diskte (export tipi, parametreler,
+veri versiyonu) anahtarıyla saklar. Dosyalar tüm gunicorn worker'larınca
+paylaşılır; toplam boyut sınırı aşıldığında en uzun süredir kullanılmayan
+dosyalar silinir (LRU).
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Optional
+
+
+class ExportCache:
+    """Sürüm anahtarlı, boyut sınırlı disk önbelleği"""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        # Üretim sırasındaki dosyalar aynı dosya sisteminde ayrı bir dizinde tutulur
+        self.temp_directory = os.path.join(directory, 'tmp')
+        os.makedirs(self.temp_directory, exist_ok=True)
+
+    def key(self, kind: str, params: Any, version: int, extension: str = '') -> str:
+        """(export tipi, parametreler, veri versiyonu) için dosya adı olarak da kullanılan anahtar"""
+        raw = json.dumps([kind, params, version], sort_keys=True, default=str)
+        return f"{kind}-{hashlib.sha1(raw.encode('utf-8')).hexdigest()[:24]}{extension}"
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Önbellekteki dosyanın yolunu döndür, yoksa None.
+        Son erişim zamanı (atime) LRU için elle güncellenir; mtime dosyanın
+        üretildiği an olarak kalır (Last-Modified).
+        """
+        path = self.path(key)
+        try:
+            stat = os.stat(path)
+            os.utime(path, (time.time(), stat.st_mtime))
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, build: Callable[[str], Any]) -> str:
+        """
+        build(geçici_yol) ile dosyayı üret ve atomik olarak önbelleğe taşı.
+        Aynı anahtarı iki worker birlikte üretirse son yazan kazanır.
+        """
+        path = self.path(key)
+        # Uzantı korunur (pandas ExcelWriter uzantıdan motor doğrular)
+        temp_path = os.path.join(self.temp_directory, f'{os.getpid()}-{threading.get_ident()}-{key}')
+        try:
+            build(temp_path)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        self.evict(keep=key)
+        return path
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """
+        Toplam boyut max_bytes'ı aşıyorsa en eski erişilen dosyaları sil.
+
+        Returns:
+            Silinen dosya sayısı
+        """
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as scanner:
+            for entry in scanner:
+                if not entry.is_file():
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_atime, stat.st_size, entry.name))
+                total += stat.st_size
+
+        removed = 0
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                continue  # Başka bir worker silmiş ya da dosya gönderiliyor
+            total -= size
+            removed += 1
+        return removed
@@ -0,0 +1,171 @@
+"""
+KAREL Network Dashboard - Alan Dönüştürücüleri
+Metin olarak saklanan koordinat, süre ve tarih alanlarını tipli değerlere çevirir.
+"""
+
+import re
+from datetime import datetime, time, timedelta, timezone
+from typing import Any, List, Optional
+
+import pandas as pd
+
+# "12 saat 30 dk", "45 dakika", "2 sa" gibi birimli süreler
+_DURATION_UNITS = re.compile(r'(\d+(?:[.,]\d+)?)\s*(saat|sa|s|dakika|dk|d)\b', re.IGNORECASE)
+
+TURKISH_MONTHS = (
+    'Ocak', 'Şubat', 'Mart', 'Nisan', 'Mayıs', 'Haziran',
+    'Temmuz', 'Ağustos', 'Eylül', 'Ekim', 'Kasım', 'Aralık'
+)
+
+# Bülten tarihleri: "06 Ocak 2025 12:20:00" (ay adı numaraya çevrildikten sonra)
+BULLETIN_DATE_FORMAT = '%d %m %Y %H:%M:%S'
+
+_WORD = re.compile(r'[^\W\d_]+')
+
+# Saat dilimi belirtilmiş ISO zamanlar ("...T12:20:00+03:00", "...12:20Z")
+_TZ_SUFFIX = re.compile(r'\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?\s*(?:Z|[+-]\d{2}(?::?\d{2})?)$', re.IGNORECASE)
+
+# Veritabanındaki tarihler Türkiye saatiyle (UTC+3) ve saat dilimsiz tutulur
+LOCAL_TIMEZONE = timezone(timedelta(hours=3))
+
+
+def _fold_turkish(text: str) -> str:
+    """Büyük/küçük harf ve ı/I/İ farkını yok say ("KASIM" == "Kasım")"""
+    return text.casefold().replace('ı', 'i').replace('\u0307', '')
+
+
+_MONTH_NUMBERS = {_fold_turkish(name): f'{number:02d}' for number, name in enumerate(TURKISH_MONTHS, 1)}
+
+
+def _is_empty(value: Any) -> bool:
+    """None, NaN ve boş metinleri boş say"""
+    if value is None:
+        return True
+    if isinstance(value, float) and value != value:  # NaN
+        return True
+    return isinstance(value, str) and not value.strip()
+
+
+def parse_coordinate(value: Any, limit: float = 180.0) -> Optional[float]:
+    """
+    Virgül veya nokta ondalıklı koordinatı float'a çevir.
+
+    Args:
+        value: "40,1885" veya 40.1885 gibi değer
+        limit: Geçerli mutlak üst sınır (enlem için 90, boylam için 180)
+
+    Returns:
+        Koordinat, geçersizse None
+    """
+    if _is_empty(value):
+        return None
+    try:
+        number = float(str(value).strip().replace(',', '.'))
+    except ValueError:
+        return None
+    if number != number or abs(number) > limit:
+        return None
+    return number
+
+
+def parse_duration_minutes(value: Any) -> Optional[int]:
+    """
+    Süre alanını dakikaya çevir.
+
+    Desteklenen biçimler: "06:17" (saat:dakika), "06:17:00",
+    "2 saat 30 dk", datetime.time / timedelta nesneleri ve
+    düz sayılar (dakika kabul edilir).
+
+    Returns:
+        Dakika cinsinden süre, çözülemezse None
+    """
+    if _is_empty(value):
+        return None
+    if isinstance(value, timedelta):
+        return int(value.total_seconds() // 60)
+    if isinstance(value, time):
+        return value.hour * 60 + value.minute
+    if isinstance(value, (int, float)):
+        return int(value)
+
+    text = str(value).strip()
+    if ':' in text:
+        parts = text.split(':')
+        try:
+            hours, minutes = int(parts[0]), int(parts[1])
+        except ValueError:
+            return None
+        return hours * 60 + minutes
+
+    units = _DURATION_UNITS.findall(text)
+    if units:
+        total = 0.0
+        for amount, unit in units:
+            amount = float(amount.replace(',', '.'))
+            total += amount * 60 if unit.lower() in ('saat', 'sa', 's') else amount
+        return int(total)
+
+    try:
+        return int(float(text.replace(',', '.')))
+    except ValueError:
+        return None
+
+
+def _month_to_number(match: 're.Match') -> str:
+    """Türkçe ay adını iki haneli ay numarasına çevir, diğer kelimelere dokunma"""
+    word = match.group(0)
+    return _MONTH_NUMBERS.get(_fold_turkish(word), word)
+
+
+def _has_timezone(value: Any) -> bool:
+    """datetime nesnesi veya ISO metni saat dilimi içeriyor mu?"""
+    if isinstance(value, datetime):
+        return value.tzinfo is not None
+    return isinstance(value, str) and _TZ_SUFFIX.search(value.strip()) is not None
+
+
+def parse_datetime_series(values: Any) -> pd.Series:
+    """
+    Tarih sütununu hücre hücre değil, bütün olarak datetime64'e çevir.
+
+    1. datetime nesneleri ve ISO 8601 metinler tek bir to_datetime çağrısıyla,
+    2. kalanlar içinde Türkçe ay isimli bülten tarihleri ("06 Ocak 2025 12:20:00")
+       tek bir regex geçişiyle ay numarasına çevrilip tek çağrıyla,
+    3. yine çözülemeyenler serbest biçimli (format='mixed') ayrıştırmayla çözülür.
+    Saat dilimli değerler Türkiye saatine çevrilip saat dilimsiz hale getirilir;
+    böylece dilimli, dilimsiz ve farklı dilimli değerler aynı sütunda karışabilir.
+    Excel içe aktarma, db_analyzer ve ai_integration bu fonksiyonu kullanır.
+
+    Args:
+        values: Series, liste veya dizi
+
+    Returns:
+        Saat dilimsiz datetime64 Series; çözülemeyen değerler NaT
+    """
+    series = pd.Series(values, dtype=object) if not isinstance(values, pd.Series) else values
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    series = series.astype(object)
+    present = series.map(lambda value: not _is_empty(value) and not isinstance(value, (int, float)))
+
+    aware = present & series.map(_has_timezone)
+
+    # Sonraki geçişlerin sonuçları farklı çözünürlükte gelebilir; birim sabitlenir
+    result = pd.to_datetime(series.where(present & ~aware), format='ISO8601', errors='coerce').astype('datetime64[us]')
+    if aware.any():
+        result[aware] = pd.to_datetime(
+            series[aware], format='ISO8601', errors='coerce', utc=True
+        ).dt.tz_convert(LOCAL_TIMEZONE).dt.tz_localize(None)
+    failed = present & result.isna()
+    if failed.any():
+        text = series[failed].astype(str).str.strip().str.replace(_WORD, _month_to_number, regex=True)
+        result[failed] = pd.to_datetime(text, format=BULLETIN_DATE_FORMAT, errors='coerce')
+        failed = present & result.isna()
+    if failed.any():
+        result[failed] = pd.to_datetime(series[failed].astype(str), format='mixed', errors='coerce')
+    return result
+
+
+def datetimes_to_python(series: pd.Series) -> List[Optional[Any]]:
+    """datetime64 Series'i veritabanına yazılabilir datetime / None listesine çevir"""
+    return [None if pd.isna(value) else value.to_pydatetime() for value in series]
@@ -0,0 +1,105 @@
+"""
+KAREL Network Dashboard - Akışlı KML/KMZ Yazıcı
+Placemark'ları nesne ağacı kurmadan doğrudan KMZ (zip) içindeki doc.kml
+girdisine yazar; bellek kullanımı kayıt sayısından bağımsızdır.
+"""
+
+import io
+import zipfile
+from typing import Dict, List, Optional
+from xml.sax.saxutils import escape
+
+
+def _cdata(text: str) -> str:
+    """Metni CDATA bloğuna al (içindeki ']]>' bölünerek korunur)"""
+    return '<![CDATA[' + text.replace(']]>', ']]]]><![CDATA[>') + ']]>'
+
+
+class KmzWriter:
+    """
+    KMZ dosyasına akışlı yazıcı.
+
+    Kullanım:
+        with KmzWriter(output, styles={'solved': 'http://.../green-dot.png'}) as kmz:
+            kmz.open_folder('Bursa')
+            kmz.placemark('Arıza #1', 29.06, 40.18, style_id='solved', description='<b>..</b>')
+            kmz.close_folder()
+
+    Stiller belge başında bir kez tanımlanır ve placemark'larda id ile
+    (styleUrl) referans verilir. Açık kalan klasörler close() ile kapatılır.
+    """
+
+    def __init__(self, output, name: str = '', styles: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            output: Dosya yolu veya yazılabilir dosya nesnesi (BytesIO)
+            name: Belge adı
+            styles: {stil id: ikon adresi}
+        """
+        self.output = output
+        self.name = name
+        self.styles = styles or {}
+        self._zip = None
+        self._stream = None
+        self._folders: List[str] = []
+
+    def __enter__(self) -> 'KmzWriter':
+        self._zip = zipfile.ZipFile(self.output, 'w', compression=zipfile.ZIP_DEFLATED)
+        entry = self._zip.open('doc.kml', 'w')
+        self._stream = io.TextIOWrapper(io.BufferedWriter(entry, buffer_size=1 << 16), encoding='utf-8')
+        self._write_header()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._stream.close()
+            self._zip.close()
+        return False
+
+    def _write_header(self):
+        self._stream.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<kml xmlns="http://www.opengis.net/kml/2.2">\n<Document>\n'
+        )
+        if self.name:
+            self._stream.write(f'<name>{escape(self.name)}</name>\n')
+        for style_id, icon_href in self.styles.items():
+            self._stream.write(
+                f'<Style id="{escape(style_id)}"><IconStyle><Icon><href>{escape(icon_href)}</href>'
+                f'</Icon></IconStyle></Style>\n'
+            )
+
+    def open_folder(self, name: str):
+        """Yeni bir <Folder> aç (iç içe açılabilir)"""
+        self._stream.write(f'<Folder><name>{escape(name)}</name>\n')
+        self._folders.append(name)
+
+    def close_folder(self):
+        """En içteki <Folder>'ı kapat"""
+        self._stream.write('</Folder>\n')
+        self._folders.pop()
+
+    @property
+    def folder_depth(self) -> int:
+        return len(self._folders)
+
+    def placemark(self, name: str, lon: float, lat: float,
+                  style_id: Optional[str] = None, description: Optional[str] = None):
+        """Tek bir nokta placemark'ı yaz"""
+        parts = [f'<Placemark><name>{escape(name)}</name>']
+        if description:
+            parts.append(f'<description>{_cdata(description)}</description>')
+        if style_id:
+            parts.append(f'<styleUrl>#{escape(style_id)}</styleUrl>')
+        parts.append(f'<Point><coordinates>{lon},{lat},0</coordinates></Point></Placemark>\n')
+        self._stream.write(''.join(parts))
+
+    def close(self):
+        """Açık klasörleri ve belgeyi kapat, zip'i tamamla"""
+        while self._folders:
+            self.close_folder()
+        self._stream.write('</Document>\n</kml>\n')
+        self._stream.close()
+        self._zip.close()
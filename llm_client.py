@@ -0,0 +1,238 @@
+"""
+KAREL Network Dashboard - LLM (Ollama) İstemcisi
+Tüm AI çağrıları tek bir keep-alive requests.Session üzerinden yapılır:
+bağlantılar havuzda tutulur (her sohbet turunda yeniden TCP kurulmaz),
+geçici hatalar backoff ile yeniden denenir, çağrı başına gecikme ve token
+sayıları toplanır. Model, adres ve zaman aşımı yalnızca AI_CONFIG'ten okunur.
+"""
+
+import json
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ai_config import AI_CONFIG
+from logging_config import log_ai_operation
+
+
+class LLMError(RuntimeError):
+    """Model çağrısı başarısız (bağlantı hatası veya HTTP hata kodu)"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class LLMMetrics:
+    """Süreç (worker) bazlı çağrı sayaçları; thread-safe"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.calls = 0
+            self.failures = 0
+            self.aborted = 0
+            self.retries = 0
+            self.prompt_tokens = 0
+            self.completion_tokens = 0
+            self.total_latency = 0.0
+            self.last_latency = None
+
+    def record(self, latency: float, success: bool, retries: int = 0,
+               prompt_tokens: int = 0, completion_tokens: int = 0, aborted: bool = False):
+        with self._lock:
+            self.calls += 1
+            self.failures += 0 if success or aborted else 1
+            self.aborted += 1 if aborted else 0
+            self.retries += retries
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            self.total_latency += latency
+            self.last_latency = latency
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'failures': self.failures,
+                'aborted': self.aborted,
+                'retries': self.retries,
+                'prompt_tokens': self.prompt_tokens,
+                'completion_tokens': self.completion_tokens,
+                'avg_latency': round(self.total_latency / self.calls, 3) if self.calls else None,
+                'last_latency': round(self.last_latency, 3) if self.last_latency is not None else None,
+            }
+
+
+class OllamaClient:
+    """
+    Ollama HTTP API istemcisi.
+
+    Kullanım:
+        text = llm.generate(prompt, temperature=0.2)
+        for token in llm.stream(prompt): ...
+        models = llm.list_models()
+
+    Hatalarda LLMError (RuntimeError) fırlatılır; mesajı kullanıcıya
+    gösterilebilir ("Model hatası: 500" veya bağlantı hatası).
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config if config is not None else AI_CONFIG
+        self.metrics = LLMMetrics()
+        self.session = requests.Session()
+        retry = Retry(
+            total=self.config.get('retries', 2),
+            connect=self.config.get('retries', 2),
+            read=0,  # Üretim sırasında zaman aşımı tekrar denenmez (süre katlanır)
+            status=self.config.get('retries', 2),
+            status_forcelist=(502, 503, 504),
+            allowed_methods=None,  # /api/generate yan etkisiz, POST da tekrar denenebilir
+            backoff_factor=self.config.get('retry_backoff', 0.5),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.config.get('pool_size', 8),
+            pool_block=True,  # Havuz doluysa yeni bağlantı açmak yerine bekle
+            max_retries=retry
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    @property
+    def model(self) -> str:
+        return self.config['model']
+
+    @property
+    def base_url(self) -> str:
+        return self.config['ollama_url'].rstrip('/')
+
+    def _timeout(self, timeout: Optional[float] = None):
+        """(bağlantı, okuma) zaman aşımı"""
+        return (self.config.get('connect_timeout', 5), timeout or self.config['timeout'])
+
+    def _request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """Havuzdaki bir bağlantıyla istek at; bağlantı hatasını LLMError'a çevir"""
+        try:
+            return self.session.request(method, f"{self.base_url}{path}", **kwargs)
+        except requests.RequestException as e:
+            raise LLMError(f"Bağlantı hatası: {e}. Ollama servisinin çalıştığından emin olun.")
+
+    def _payload(self, prompt: str, model: Optional[str], temperature: Optional[float],
+                 stream: bool) -> Dict[str, Any]:
+        return {
+            'model': model or self.model,
+            'prompt': prompt,
+            'stream': stream,
+            'options': {
+                'temperature': self.config['temperature'] if temperature is None else temperature,
+                'num_predict': self.config['max_tokens'],
+            }
+        }
+
+    def generate(self, prompt: str, model: Optional[str] = None,
+                 temperature: Optional[float] = None, timeout: Optional[float] = None) -> str:
+        """Tek seferlik (stream=False) üretim; yanıt metnini döndür"""
+        payload = self._payload(prompt, model, temperature, stream=False)
+        started = time.perf_counter()
+        retries = 0
+        try:
+            response = self._request('POST', '/api/generate', json=payload, timeout=self._timeout(timeout))
+            retries = len(response.raw.retries.history) if getattr(response.raw, 'retries', None) else 0
+            if response.status_code != 200:
+                raise LLMError(f"Model hatası: {response.status_code}", response.status_code)
+            try:
+                body = response.json()
+            except ValueError:
+                raise LLMError("Model yanıtı çözümlenemedi", response.status_code)
+        except LLMError as e:
+            latency = time.perf_counter() - started
+            self.metrics.record(latency, success=False, retries=retries)
+            log_ai_operation('generate', model=payload['model'], duration=latency, success=False, error=e)
+            raise
+
+        latency = time.perf_counter() - started
+        prompt_tokens = body.get('prompt_eval_count', 0)
+        completion_tokens = body.get('eval_count', 0)
+        self.metrics.record(latency, success=True, retries=retries,
+                            prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        log_ai_operation('generate', model=payload['model'], tokens=prompt_tokens + completion_tokens,
+                         duration=round(latency, 3))
+        return body.get('response', '')
+
+    def stream(self, prompt: str, model: Optional[str] = None,
+               temperature: Optional[float] = None, timeout: Optional[float] = None) -> Iterator[str]:
+        """
+        Akışlı (stream=True) üretim; token parçalarını geldikçe yield eder.
+        Generator erken kapatılırsa (istemci bağlantıyı kopardı) Ollama
+        bağlantısı kapatılır ve model üretimi yarıda keser.
+        """
+        payload = self._payload(prompt, model, temperature, stream=True)
+        started = time.perf_counter()
+        response = None
+        prompt_tokens = completion_tokens = 0
+        success = aborted = False
+        try:
+            # timeout okuma için token'lar arası bekleme süresidir, toplam süre değil
+            response = self._request('POST', '/api/generate', json=payload,
+                                     timeout=self._timeout(timeout), stream=True)
+            if response.status_code != 200:
+                raise LLMError(f"Model hatası: {response.status_code}", response.status_code)
+            try:
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get('error'):
+                        raise LLMError(f"Model hatası: {chunk['error']}")
+                    if chunk.get('response'):
+                        yield chunk['response']
+                    if chunk.get('done'):
+                        prompt_tokens = chunk.get('prompt_eval_count', 0)
+                        completion_tokens = chunk.get('eval_count', 0)
+                        break
+            except (requests.RequestException, ValueError) as e:
+                raise LLMError(f"Bağlantı hatası: {e}")
+            success = True
+        except GeneratorExit:
+            aborted = True  # Tüketici vazgeçti; bağlantı aşağıda kapatılır
+            raise
+        except LLMError as e:
+            log_ai_operation('stream', model=payload['model'], success=False, error=e)
+            raise
+        finally:
+            if response is not None:
+                response.close()
+            latency = time.perf_counter() - started
+            self.metrics.record(latency, success=success, aborted=aborted,
+                                prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+            if success:
+                log_ai_operation('stream', model=payload['model'], tokens=prompt_tokens + completion_tokens,
+                                 duration=round(latency, 3))
+
+    def list_models(self) -> List[str]:
+        """Yüklü model adları"""
+        response = self._request('GET', '/api/tags', timeout=self._timeout(10))
+        if response.status_code != 200:
+            raise LLMError(f"Ollama hatası: {response.status_code}", response.status_code)
+        return [model['name'] for model in response.json().get('models', [])]
+
+    def is_available(self) -> bool:
+        """Ollama servisine ulaşılabiliyor mu?"""
+        try:
+            self.list_models()
+            return True
+        except LLMError:
+            return False
+
+
+# Paylaşılan istemci - bütün çağrı noktaları bunu kullanır
+llm = OllamaClient()
@@ -5,24 +5,20 @@ Ollama ve diğer local model seçenekleri
 """
 
 import subprocess
-import requests
 import json
 import os
 from typing import Dict, Any, Optional
 import platform
 
+from llm_client import llm, LLMError
+
 class LocalAISetup:
     def __init__(self):
         self.os_type = platform.system()
-        self.ollama_url = "http://localhost:11434"
         
     def check_ollama_installed(self) -> bool:
         """Ollama'nın kurulu olup olmadığını kontrol et"""
-        try:
-            response = requests.get(f"{self.ollama_url}/api/tags")
-            return response.status_code == 200
-        except:
-            return False
+        return llm.is_available()
     
     def install_ollama(self):
         """Ollama kurulum talimatları"""
@@ -104,33 +100,22 @@ brew install ollama
         """
         
         try:
-            response = requests.post(
-                f"{self.ollama_url}/api/generate",
-                json={
-                    "model": model_name,
-                    "prompt": test_prompt,
-                    "stream": False
-                }
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                print("✅ Model Yanıtı:")
-                print(result.get("response", "Yanıt alınamadı"))
-            else:
-                print(f"❌ Hata: {response.status_code}")
+            result = llm.generate(test_prompt, model=model_name)
+            print("✅ Model Yanıtı:")
+            print(result or "Yanıt alınamadı")
+        except LLMError as e:
+            print(f"❌ {str(e)}")
+            if e.status_code is not None:
                 print("Model indirilmemiş olabilir. Önce: ollama pull", model_name)
-        except Exception as e:
-            print(f"❌ Bağlantı hatası: {str(e)}")
-            print("Ollama servisinin çalıştığından emin olun: ollama serve")
+            else:
+                print("Ollama servisinin çalıştığından emin olun: ollama serve")
 
 
 class FiberArizaLocalAI:
     """Fiber arıza analizi için local AI"""
     
-    def __init__(self, model_name: str = "deepseek-r1:7b"):  # 7b varsayılan
-        self.model_name = model_name
-        self.ollama_url = "http://localhost:11434"
+    def __init__(self, model_name: Optional[str] = None):  # Varsayılan: AI_CONFIG modeli
+        self.model_name = model_name or llm.model
         self.context_loaded = False
         self.context = ""
         
@@ -185,22 +170,9 @@ Sen Türkiye fiber optik altyapı uzmanısın. KAREL Network Dashboard veritaban
         full_prompt = f"{self.context}\n\nKullanıcı Sorusu: {prompt}\n\nYanıt:"
         
         try:
-            response = requests.post(
-                f"{self.ollama_url}/api/generate",
-                json={
-                    "model": self.model_name,
-                    "prompt": full_prompt,
-                    "temperature": temperature,
-                    "stream": False
-                }
-            )
-            
-            if response.status_code == 200:
-                return response.json().get("response", "Yanıt alınamadı")
-            else:
-                return f"Hata: {response.status_code}"
-        except Exception as e:
-            return f"Bağlantı hatası: {str(e)}"
+            return llm.generate(full_prompt, model=self.model_name, temperature=temperature) or "Yanıt alınamadı"
+        except LLMError as e:
+            return f"Hata: {str(e)}"
     
     def chat_interactive(self):
         """İnteraktif sohbet modu"""
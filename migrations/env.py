@@ -2,9 +2,12 @@ import logging
 from logging.config import fileConfig
 
 from flask import current_app
+from sqlalchemy import inspect
 
 from alembic import context
 
+from app import SPATIAL_INDEX_TABLE, SPATIAL_INDEX_DDL
+
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
@@ -51,6 +54,28 @@ def get_metadata():
     return target_db.metadata
 
 
+def include_name(name, type_, parent_names):
+    """
+    R*Tree sanal tablosu ve gölge tabloları (fiber_ariza_rtree_node, _parent,
+    _rowid) modelde yok; autogenerate bunları silinmiş tablo saymasın.
+    """
+    if type_ == 'table':
+        return not name.startswith(SPATIAL_INDEX_TABLE)
+    return True
+
+
+def restore_spatial_index_triggers(connection):
+    """
+    SQLite'ta batch_alter_table('fiber_ariza') tabloyu kopyalayıp yeniden
+    oluşturur ve R*Tree trigger'larını sessizce siler; migration'lardan sonra
+    eksik trigger'lar yeniden kurulur (CREATE TRIGGER IF NOT EXISTS).
+    """
+    if not inspect(connection).has_table(SPATIAL_INDEX_TABLE):
+        return
+    for statement in SPATIAL_INDEX_DDL[1:]:
+        connection.exec_driver_sql(statement)
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -65,7 +90,8 @@ def run_migrations_offline():
     """
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url, target_metadata=get_metadata(), literal_binds=True
+        url=url, target_metadata=get_metadata(), literal_binds=True,
+        include_name=include_name
     )
 
     with context.begin_transaction():
@@ -93,6 +119,7 @@ def run_migrations_online():
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    conf_args.setdefault("include_name", include_name)
 
     connectable = get_engine()
 
@@ -105,6 +132,7 @@ def run_migrations_online():
 
         with context.begin_transaction():
             context.run_migrations()
+            restore_spatial_index_triggers(connection)
 
 
 if context.is_offline_mode():
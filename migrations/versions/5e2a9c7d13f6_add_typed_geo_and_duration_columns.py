@@ -0,0 +1,133 @@
+"""Add typed geo and duration columns to FiberAriza
+
+Revision ID: 5e2a9c7d13f6
+Revises: c41d8e7f25b3
+Create Date: 2026-10-18 12:44:19.091276
+
+"""
+import re
+from datetime import time, timedelta
+from typing import Any, Optional
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e2a9c7d13f6'
+down_revision = 'c41d8e7f25b3'
+branch_labels = None
+depends_on = None
+
+# Backfill sırasında tek seferde işlenecek satır sayısı
+BATCH_SIZE = 1000
+
+
+# field_parsers modülünün bu revizyondaki kopyası: canlı modül ileride
+# değişse de bu migration aynı değerleri üretmeli, bu yüzden import edilmez.
+_DURATION_UNITS = re.compile(r'(\d+(?:[.,]\d+)?)\s*(saat|sa|s|dakika|dk|d)\b', re.IGNORECASE)
+
+
+def _is_empty(value: Any) -> bool:
+    """None, NaN ve boş metinleri boş say"""
+    if value is None:
+        return True
+    if isinstance(value, float) and value != value:  # NaN
+        return True
+    return isinstance(value, str) and not value.strip()
+
+
+def parse_coordinate(value: Any, limit: float = 180.0) -> Optional[float]:
+    """Virgül veya nokta ondalıklı koordinatı float'a çevir, geçersizse None"""
+    if _is_empty(value):
+        return None
+    try:
+        number = float(str(value).strip().replace(',', '.'))
+    except ValueError:
+        return None
+    if number != number or abs(number) > limit:
+        return None
+    return number
+
+
+def parse_duration_minutes(value: Any) -> Optional[int]:
+    """Süre alanını ("06:17", "2 saat 30 dk", sayı...) dakikaya çevir, çözülemezse None"""
+    if _is_empty(value):
+        return None
+    if isinstance(value, timedelta):
+        return int(value.total_seconds() // 60)
+    if isinstance(value, time):
+        return value.hour * 60 + value.minute
+    if isinstance(value, (int, float)):
+        return int(value)
+
+    text = str(value).strip()
+    if ':' in text:
+        parts = text.split(':')
+        try:
+            hours, minutes = int(parts[0]), int(parts[1])
+        except ValueError:
+            return None
+        return hours * 60 + minutes
+
+    units = _DURATION_UNITS.findall(text)
+    if units:
+        total = 0.0
+        for amount, unit in units:
+            amount = float(amount.replace(',', '.'))
+            total += amount * 60 if unit.lower() in ('saat', 'sa', 's') else amount
+        return int(total)
+
+    try:
+        return int(float(text.replace(',', '.')))
+    except ValueError:
+        return None
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('fiber_ariza', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('lat', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('lon', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('ariza_suresi_dk', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('hags_suresi_dk', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('kesinti_suresi_dk', sa.Integer(), nullable=True))
+
+    # ### end Alembic commands ###
+
+    # Mevcut kayıtları id sırasıyla parça parça doldur
+    conn = op.get_bind()
+    select_batch = sa.text(
+        "SELECT id, kordinat_a, kordinat_b, ariza_suresi, hags_suresi, kesinti_suresi "
+        "FROM fiber_ariza WHERE id > :last_id ORDER BY id LIMIT :limit"
+    )
+    update_row = sa.text(
+        "UPDATE fiber_ariza SET lat = :lat, lon = :lon, ariza_suresi_dk = :ariza_suresi_dk, "
+        "hags_suresi_dk = :hags_suresi_dk, kesinti_suresi_dk = :kesinti_suresi_dk WHERE id = :id"
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(select_batch, {'last_id': last_id, 'limit': BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+        conn.execute(update_row, [{
+            'id': row.id,
+            'lat': parse_coordinate(row.kordinat_a, limit=90),
+            'lon': parse_coordinate(row.kordinat_b, limit=180),
+            'ariza_suresi_dk': parse_duration_minutes(row.ariza_suresi),
+            'hags_suresi_dk': parse_duration_minutes(row.hags_suresi),
+            'kesinti_suresi_dk': parse_duration_minutes(row.kesinti_suresi),
+        } for row in rows])
+        last_id = rows[-1].id
+
+
+def downgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('fiber_ariza', schema=None) as batch_op:
+        batch_op.drop_column('kesinti_suresi_dk')
+        batch_op.drop_column('hags_suresi_dk')
+        batch_op.drop_column('ariza_suresi_dk')
+        batch_op.drop_column('lon')
+        batch_op.drop_column('lat')
+
+    # ### end Alembic commands ###
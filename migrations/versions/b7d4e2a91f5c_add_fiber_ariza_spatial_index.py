@@ -0,0 +1,56 @@
+"""Add fiber_ariza spatial index
+
+Revision ID: b7d4e2a91f5c
+Revises: f3a8c61d9e42
+Create Date: 2026-10-18 23:12:40.518263
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d4e2a91f5c'
+down_revision = 'f3a8c61d9e42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # R*Tree sanal tablosu ve senkron trigger'ları (app.SPATIAL_INDEX_DDL ile aynı).
+    # Not: sonraki migration'larda batch_alter_table('fiber_ariza') tabloyu yeniden
+    # oluşturur ve bu trigger'ları siler; env.py migration'lardan sonra onları yeniden kurar.
+    op.execute("CREATE VIRTUAL TABLE IF NOT EXISTS fiber_ariza_rtree USING rtree(id, min_lat, max_lat, min_lon, max_lon)")
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS fiber_ariza_rtree_insert AFTER INSERT ON fiber_ariza
+        WHEN new.lat IS NOT NULL AND new.lon IS NOT NULL BEGIN
+            INSERT INTO fiber_ariza_rtree VALUES (new.id, new.lat, new.lat, new.lon, new.lon);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS fiber_ariza_rtree_update AFTER UPDATE OF id, lat, lon ON fiber_ariza BEGIN
+            DELETE FROM fiber_ariza_rtree WHERE id = old.id;
+            INSERT INTO fiber_ariza_rtree
+                SELECT new.id, new.lat, new.lat, new.lon, new.lon
+                WHERE new.lat IS NOT NULL AND new.lon IS NOT NULL;
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS fiber_ariza_rtree_delete AFTER DELETE ON fiber_ariza BEGIN
+            DELETE FROM fiber_ariza_rtree WHERE id = old.id;
+        END
+    """)
+
+    # Mevcut koordinatlı kayıtlardan indeksi doldur
+    op.execute("""
+        INSERT INTO fiber_ariza_rtree
+        SELECT id, lat, lat, lon, lon FROM fiber_ariza
+        WHERE lat IS NOT NULL AND lon IS NOT NULL
+    """)
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS fiber_ariza_rtree_delete")
+    op.execute("DROP TRIGGER IF EXISTS fiber_ariza_rtree_update")
+    op.execute("DROP TRIGGER IF EXISTS fiber_ariza_rtree_insert")
+    op.execute("DROP TABLE IF EXISTS fiber_ariza_rtree")